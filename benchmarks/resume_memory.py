@@ -0,0 +1,80 @@
+# Memory held by cached resumes loaded as the old dicts and as Resume records. Both are built
+# from the JSON rows the caches store, as a cache load does, and measured with tracemalloc.
+#
+#     python3 -m benchmarks.resume_memory
+
+import json
+import random
+import tracemalloc
+
+from parsers.resume import ExperienceEntry, Resume
+
+RESUMES = 5000
+CITIES = ("Київ", "Львів", "Одеса", "Дніпро", "Харків")
+DURATIONS = ("1 рік", "2 роки", "3 роки", "5 років", "8 місяців", "1 рік 6 місяців")
+SKILLS = [f"Skill {i}" for i in range(300)]
+COMPANIES = [f"Company {i}" for i in range(500)]
+
+
+def build_resume(rng, number):
+    experience = [
+        ExperienceEntry(
+            title=f"Designer {rng.randrange(50)}",
+            name=rng.choice(COMPANIES),
+            duration=rng.choice(DURATIONS),
+            additional_info=f"Responsibilities of resume {number}, job {job}: " + "design " * 20,
+        )
+        for job in range(3)
+    ]
+    return Resume(
+        position=f"Designer {rng.randrange(50)}",
+        location=rng.choice(CITIES),
+        salary_expectation=f"{rng.randrange(15, 60)} 000 грн",
+        skills=rng.sample(SKILLS, 8),
+        experience=experience,
+        add_info=f"About candidate {number}: " + "portfolio " * 30,
+        link=f"https://www.work.ua/resumes/{number}/",
+        site="Work.ua",
+    )
+
+
+def as_dict(resume):
+    # How resumes were cached before the records
+    return {
+        "position": resume.position,
+        "location": resume.location,
+        "salary_expectation": resume.salary_expectation,
+        "skills": list(resume.skills),
+        "jobs_and_education": [
+            {"title": entry.title, "name": entry.name, "duration": entry.duration, "additional_info": entry.additional_info}
+            for entry in resume.experience
+        ],
+        "add_info": resume.add_info,
+        "link": resume.link,
+        "site": resume.site,
+    }
+
+
+def measure(load, rows):
+    tracemalloc.start()
+    loaded = [load(row) for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return size
+
+
+def main():
+    rng = random.Random(0)
+    resumes = [build_resume(rng, number) for number in range(RESUMES)]
+    dict_rows = [json.dumps(as_dict(resume), ensure_ascii=False) for resume in resumes]
+    record_rows = [resume.to_json() for resume in resumes]
+    del resumes
+
+    dicts = measure(json.loads, dict_rows)
+    records = measure(Resume.from_json, record_rows)
+    print(f"{RESUMES} resumes: dicts {dicts / 1e6:.1f} MB, records {records / 1e6:.1f} MB ({dicts / records:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
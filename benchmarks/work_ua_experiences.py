@@ -0,0 +1,57 @@
+# Times Work.ua experience extraction on synthetic CVs with many jobs and courses.
+# Per-entry cost should stay flat as the number of entries grows.
+#
+#     python3 -m benchmarks.work_ua_experiences
+
+import time
+
+from bs4 import BeautifulSoup
+
+from parsers.work_ua_extractor import extract_resume
+from parsers.work_ua_parser import WorkUaParser
+
+ENTRY_COUNTS = (30, 60, 120, 240)
+ROUNDS = 5
+
+
+def build_resume(entries):
+    experiences = "".join(
+        f'<h2 class="h4 strong-600 mt-lg sm:mt-xl">Job {i} <span class="text-default-7">(2 роки)</span></h2>'
+        f'<p class="mb-0"><span>01.2020 — 01.2022</span>\nCompany {i}</p>'
+        # Courses have no additional info, so a per-title find_next has to scan to the end of the page
+        + (f'<p class="text-default-7 mb-0">Responsibilities {i}</p>' if i % 2 else "")
+        for i in range(entries)
+    )
+    return (
+        '<html><body><h2 class="mt-lg sm:mt-xl">Designer</h2>'
+        '<dl><dt>Місто проживання:</dt><dd>Київ</dd></dl>'
+        f'{experiences}'
+        '<h2 class="h4 strong-600 mt-lg sm:mt-xl">Контактна інформація</h2>'
+        '</body></html>'
+    )
+
+
+def timed(func):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    parser = WorkUaParser("designer")
+    print(f"{'entries':>8} {'parse_experiences':>20} {'extract_resume':>20}")
+    for entries in ENTRY_COUNTS:
+        html = build_resume(entries)
+        soup = BeautifulSoup(html, "html.parser")
+        tree_time = timed(lambda: parser.parse_experiences(soup))
+        single_pass_time = timed(lambda: extract_resume(html, "benchmark"))
+        print(
+            f"{entries:>8} "
+            f"{tree_time * 1000:>9.2f}ms {tree_time / entries * 1e6:>6.0f}us/e "
+            f"{single_pass_time * 1000:>9.2f}ms {single_pass_time / entries * 1e6:>6.0f}us/e"
+        )
+
+
+if __name__ == "__main__":
+    main()
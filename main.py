@@ -1,9 +1,22 @@
-from parsers.work_ua_parser import WorkUaParser
-from parsers.robota_ua_parser import RobotaUaParser
+from parsers import http_cache, http_client, registry, resume_cache, resume_store, workers
+from parsers.dedup import DuplicateFilter
+from parsers.singleflight import SingleFlight
+from search.federated import FederatedSearch
+from search.history import SearchHistory
+from search.limits import SearchLimiter, SearchLimitExceeded
+from search.query import normalize_query, query_key
+from search.ranking import RankingIndex, rank
+from search.result_cache import SearchResultCache
+from search.warmer import CacheWarmer
 from dotenv import load_dotenv
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CommandHandler, MessageHandler, ConversationHandler, filters, ContextTypes
+from contextlib import aclosing
+import asyncio
 import os
+import re
+import time
 
 load_dotenv()
 TOKEN = os.getenv('TOKEN')
@@ -11,8 +24,62 @@ TOKEN = os.getenv('TOKEN')
 # Stages of the conversation
 JOB_POSITION, LOCATION, SALARY, EXPERIENCE, ENGLISH_LANGUAGE, KEYWORDS, SITE_SELECTION = range(7)
 
+# One numbered choice per registered site, plus one for all of them. Only the names are
+# needed here, the parser modules are imported when a search first uses them.
+SITE_NAMES = registry.source_names()
+ALL_SITES = ", ".join(SITE_NAMES[:-1]) + " and " + SITE_NAMES[-1] if len(SITE_NAMES) > 1 else SITE_NAMES[0]
+SITE_CHOICES = {str(number): site for number, site in enumerate(SITE_NAMES, start=1)}
+SITE_CHOICES[str(len(SITE_NAMES) + 1)] = ALL_SITES
+SITE_MENU = "\n".join(f"{number}. {'All sites' if site == ALL_SITES else site}" for number, site in SITE_CHOICES.items())
+
+MAX_RESULTS = 10  # Resumes sent per search
+STORE_CANDIDATES = 100  # Stored matches ranked to pick the ones sent
+STATUS_UPDATE_INTERVAL = 1.0  # Seconds between edits of the "found so far" status message
+
+# Caps on searches running at the same time, so one busy user can't starve the others
+search_limiter = SearchLimiter(
+    max_searches=int(os.getenv("MAX_SEARCHES", 20)),
+    max_per_user=int(os.getenv("MAX_SEARCHES_PER_USER", 1)),
+)
+
+# Results of recent searches, so repeating a search doesn't hit the sites again
+search_cache = SearchResultCache(
+    ttl=int(os.getenv("SEARCH_CACHE_TTL", 600)),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", 500)),
+)
+
+# Searches with enough matches among resumes seen within this many seconds are answered from
+# the local resume store without hitting the sites; 0 always searches live
+RESUME_STORE_MAX_AGE = int(os.getenv("RESUME_STORE_MAX_AGE", 24 * 3600))
+
+# Identical searches running at the same time share one fetch
+search_flights = SingleFlight()
+
+# Every search is recorded, so the most popular ones can be prefetched off-peak
+search_history = SearchHistory(
+    os.getenv("SEARCH_HISTORY_PATH", os.path.join(".cache", "search_history.sqlite3")) or ":memory:"
+)
+
+# Blocking work started with asyncio.to_thread / run_in_executor goes to the shared thread pool
+async def init_workers(application: Application):
+    asyncio.get_running_loop().set_default_executor(workers.get_thread_pool())
+
+# Close the shared HTTP connection pools and worker pools when the bot stops
+async def shutdown_resources(application: Application):
+    http_client.close()
+    await http_client.aclose()
+    http_cache.close()
+    resume_cache.close()
+    resume_store.close()
+    search_history.close()
+    workers.shutdown()
+
 # Initialize the bot
-application = Application.builder().token(TOKEN).build()
+application = Application.builder().token(TOKEN).post_init(init_workers).post_shutdown(shutdown_resources).build()
+
+# Background job: prefetch popular searches into the result cache during off-peak hours
+async def warm_search_cache(context: ContextTypes.DEFAULT_TYPE):
+    await cache_warmer.run()
 
 # Start command
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -28,6 +95,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Here are the available commands:\n"
         "/start - Starts the bot\n"
         "/search - Starts a resume search\n"
+        "/refresh - Repeats your last search with fresh results\n"
         "/help - Shows this message"
     )
 
@@ -66,72 +134,232 @@ async def english_language_step(update: Update, context: ContextTypes.DEFAULT_TY
 
 async def keywords_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["keywords"] = update.message.text
-    await update.message.reply_text("Which site do you want to search resumes on?\n1. Work.ua\n2. Robota.ua")
+    await update.message.reply_text(f"Which site do you want to search resumes on?\n{SITE_MENU}")
     return SITE_SELECTION
 
 async def site_selection_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
     site_choice = update.message.text.strip()
 
-    if site_choice == "1":
-        parser_class, site_name = WorkUaParser, "Work.ua"
-    elif site_choice == "2":
-        parser_class, site_name = RobotaUaParser, "Robota.ua"
-    else:
-        await update.message.reply_text("Invalid choice. Please enter 1 for Work.ua or 2 for Robota.ua.")
+    if site_choice not in SITE_CHOICES:
+        await update.message.reply_text(f"Invalid choice. Please enter a number from 1 to {len(SITE_CHOICES)}.")
         return SITE_SELECTION
 
-    context.user_data["site"] = site_name
+    context.user_data["site"] = SITE_CHOICES[site_choice]
+    await run_search(update, context)
+    return ConversationHandler.END
+
+# Refresh command: repeats the last search, bypassing the result cache, the resume store and
+# the cached pages of the sites
+async def refresh_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if "site" not in context.user_data:
+        await update.message.reply_text("There is no search to refresh yet. Enter /search to start one.")
+        return
+    with http_client.no_cache():
+        await run_search(update, context, refresh=True)
 
-    salary = context.user_data["salary"]
-    
-    if salary and salary.isdigit():
-        salary = int(salary)
-    else:
-        salary = None  # If no salary or invalid, set to None
-    
-    if site_name == "Robota.ua":
-        salary = {"from": salary if salary else 20000, "to": salary if salary else 40000}  # Default salary range
+async def run_search(update: Update, context: ContextTypes.DEFAULT_TYPE, refresh=False):
+    site_name = context.user_data["site"]
+    key = query_key(context.user_data)
+    await asyncio.to_thread(search_history.record, context.user_data)
+
+    if not refresh:
+        cached_resumes = search_cache.get(key)
+        if cached_resumes is not None:
+            await send_cached_results(update, cached_resumes, site_name)
+            return
+
+        stored_resumes = await asyncio.to_thread(find_stored_resumes, context.user_data)
+        if stored_resumes is not None:
+            await send_cached_results(update, stored_resumes, site_name)
+            return
+
+    in_flight = search_flights.join(key)
+    if in_flight is not None:
+        await update.message.reply_text(f"The same search on {site_name} is already running, waiting for its results...")
+        resumes = await asyncio.shield(in_flight)
+        if resumes is not None:
+            await send_shared_results(update, resumes)
+            return
+        # The shared search failed, run our own below
+
+    parser = build_parser(context.user_data)
+
+    if search_limiter.is_busy():
+        await update.message.reply_text("Many searches are running right now, yours will start shortly.")
+
+    query = normalize_query(context.user_data)
+    try:
+        async with search_limiter.slot(update.effective_user.id):
+            # An identical search may have started while this one waited for a slot, then its
+            # send_results goes to the other user and this one only gets the resumes back
+            resumes, led = await search_flights.run_or_follow(key, send_results, update, parser, site_name, query)
+            if not led and resumes is None:
+                # The search we waited for failed, run our own
+                resumes = await send_results(update, parser, site_name, query)
+                led = True
+    except SearchLimitExceeded as e:
+        await update.message.reply_text(str(e))
+        return
 
-    experience = int(context.user_data["years_of_experience"]) if context.user_data["years_of_experience"] and context.user_data["years_of_experience"].isdigit() else None
+    if not led:
+        await send_shared_results(update, resumes)
+    elif resumes is not None and not failed_sites(parser):
+        search_cache.put(key, resumes)  # Results missing a site aren't kept, the next search tries it again
 
-    parser = parser_class(
-        job_position=context.user_data["job_position"],
-        location=context.user_data["location"],
-        salary=salary,  # Pass as integer for Work.ua, or dictionary for Robota.ua
+# Runs a search without sending anything, for the cache warmer
+async def fetch_results(user_data):
+    resumes = []
+    duplicates = DuplicateFilter()
+    try:
+        # Inside the try: a recorded search may name a site that is no longer registered
+        parser = build_parser(user_data)
+        async with aclosing(parser.aiter_resumes(num_pages=1)) as stream:
+            async for resume in stream:
+                if not duplicates.is_duplicate(resume):
+                    resumes.append(resume)
+    except Exception as e:
+        print(f"Failed to prefetch search {query_key(user_data)}: {e}")
+        return None
+    if failed_sites(parser):
+        return None  # Not worth caching for hours without those sites
+    return rank(resumes, normalize_query(user_data), limit=MAX_RESULTS)
+
+async def warm_search(user_data):
+    # Shares the fetch with a user running the same search meanwhile
+    return await search_flights.run(query_key(user_data), fetch_results, user_data)
+
+cache_warmer = CacheWarmer(
+    search_history,
+    search_cache,
+    warm_search,
+    hours=os.getenv("WARM_CACHE_HOURS", "1-6"),
+    daily_budget=int(os.getenv("WARM_CACHE_BUDGET", 500)),
+    max_queries=int(os.getenv("WARM_CACHE_QUERIES", 20)),
+    ttl=int(os.getenv("WARM_CACHE_TTL", 12 * 3600)),
+)
+
+def find_stored_resumes(user_data):
+    # Only a full page of matches counts, otherwise the live search would likely find more
+    store = resume_store.get_resume_store()
+    if store is None or not RESUME_STORE_MAX_AGE:
+        return None
+    filters = normalize_query(user_data)
+    if user_data["site"] == ALL_SITES:
+        filters["site"] = None
+    resumes = store.search(**filters, max_age=RESUME_STORE_MAX_AGE, limit=STORE_CANDIDATES)
+    return rank(resumes, filters, limit=MAX_RESULTS) if len(resumes) >= MAX_RESULTS else None
+
+def build_parser(user_data):
+    site_name = user_data["site"]
+    if site_name == ALL_SITES:
+        # One parser per site, each built as if that site had been chosen
+        sources = {site: build_parser({**user_data, "site": site}) for site in SITE_NAMES}
+        return FederatedSearch(sources, timeouts={site: site_timeout(site) for site in SITE_NAMES})
+
+    def skipped_to_none(value):
+        return None if value in (None, "", "-") else value
+
+    salary = user_data["salary"]
+    salary = int(salary) if salary and salary.isdigit() else None  # If no salary or invalid, set to None
+    experience = int(user_data["years_of_experience"]) if user_data["years_of_experience"] and user_data["years_of_experience"].isdigit() else None
+
+    # Every site takes the same filters, see parsers/source.py
+    return registry.create(
+        site_name,
+        job_position=skipped_to_none(user_data["job_position"]),
+        location=skipped_to_none(user_data["location"]),
+        salary=salary,
         experience=experience,
-        english_language=context.user_data["english_language"],
-        keywords=context.user_data["keywords"]
+        english_language=skipped_to_none(user_data["english_language"]),
+        keywords=skipped_to_none(user_data["keywords"]),
     )
 
-    await update.message.reply_text(f"Fetching resumes from {site_name}...")
+def failed_sites(parser):
+    # Sites whose results are missing or incomplete: timed out in a search of all sites, or lost
+    # results to requests that failed (see ResumeSource.failed)
+    return getattr(parser, "failed", [])
+
+def site_timeout(site):
+    # Seconds a site gets in a search of all sites, e.g. WORK_UA_SEARCH_TIMEOUT for Work.ua
+    env_name = re.sub(r"\W+", "_", site).upper() + "_SEARCH_TIMEOUT"
+    return float(os.getenv(env_name, registry.get_source(site).CAPABILITIES.search_timeout))
+
+async def send_cached_results(update: Update, resumes, site_name):
+    await update.message.reply_text(f"Showing recent results from {site_name}. Enter /refresh to fetch fresh ones.")
+    await send_shared_results(update, resumes)
 
+async def send_shared_results(update: Update, resumes):
+    for idx, resume in enumerate(resumes, start=1):
+        await update.message.reply_text(format_resume(idx, resume))
+    if not resumes:
+        await update.message.reply_text("No resumes found for the given criteria.")
+
+async def send_results(update: Update, parser, site_name, query):
+    status_message = await update.message.reply_text(f"Fetching resumes from {site_name}...")
+    last_status_update = time.monotonic()
+
+    found = RankingIndex()
+    duplicates = DuplicateFilter()  # The same candidate on both sites, or twice on one, is shown once
     try:
-        resumes = parser.fetch_resumes()
-
-        if not resumes:
-            await update.message.reply_text("No resumes found for the given criteria.")
-            return ConversationHandler.END
-        
-        # Limit to 10 resumes
-        for idx, resume in enumerate(resumes[:10], start=1):
-            skills_str = ", ".join(resume.get('skills', [])) if resume.get('skills') else 'Not Specified'
-            
-            # Handle salary display as 'Not Specified' if empty
-            salary_str = resume.get('salary_expectation', '').strip()
-            salary_str = salary_str if salary_str else 'Not Specified'
-
-            await update.message.reply_text(
-                f"\nResume {idx}:\n"
-                f"Position: {resume.get('position', 'N/A')}\n"
-                f"Location: {resume.get('location', 'N/A')}\n"
-                f"Salary: {salary_str}\n"
-                f"Skills: {skills_str}\n"
-                f"Link: {resume.get('link', 'N/A')}"
-            )
+        # Collect the whole result page with a live counter in the status message, then send
+        # the best matches among all of them rather than the first ones the sites returned.
+        # Each resume is indexed for ranking as it arrives, while the others are still loading.
+        async with aclosing(parser.aiter_resumes(num_pages=1)) as stream:
+            async for resume in stream:
+                if duplicates.is_duplicate(resume):
+                    continue
+                found.add(resume)
+
+                if time.monotonic() - last_status_update >= STATUS_UPDATE_INTERVAL:
+                    await update_status(status_message, f"Fetching resumes from {site_name}... {len(found)} found so far")
+                    last_status_update = time.monotonic()
     except Exception as e:
+        await update_status(status_message, f"Search on {site_name} stopped after {len(found)} resumes.")
         await update.message.reply_text(f"An error occurred while fetching resumes: {e}")
+        for idx, resume in enumerate(found.rank(query, limit=MAX_RESULTS), start=1):
+            await update.message.reply_text(format_resume(idx, resume))
+        return None
 
-    return ConversationHandler.END
+    resumes = found.rank(query, limit=MAX_RESULTS)
+    if not resumes:
+        await update_status(status_message, f"Search on {site_name} finished.")
+    elif len(found) > len(resumes):
+        await update_status(status_message, f"Search on {site_name} finished: {len(found)} resumes found, showing the best {len(resumes)}.")
+    else:
+        await update_status(status_message, f"Search on {site_name} finished: {len(found)} resumes found.")
+    failed = failed_sites(parser)
+    if failed:
+        await update.message.reply_text(
+            f"{' and '.join(failed)} timed out or failed, so results from there are missing or incomplete. "
+            "Enter /refresh to try again."
+        )
+    await send_shared_results(update, resumes)
+    return resumes
+
+async def update_status(message, text):
+    try:
+        await message.edit_text(text)
+    except BadRequest as e:  # e.g. the text didn't change or the message was deleted
+        print(f"Failed to update status message: {e}")
+
+def format_resume(idx, resume):
+    # Robota.ua resumes list no skills, their work experience is shown instead
+    skills = resume.skills or [entry.summary() for entry in resume.experience]
+    skills_str = ", ".join(skills) if skills else 'Not Specified'
+
+    # Handle salary display as 'Not Specified' if empty
+    salary_str = resume.salary_expectation.strip()
+    salary_str = salary_str if salary_str else 'Not Specified'
+
+    return (
+        f"\nResume {idx}:\n"
+        f"Site: {resume.site}\n"
+        f"Position: {resume.position}\n"
+        f"Location: {resume.location}\n"
+        f"Salary: {salary_str}\n"
+        f"Skills: {skills_str}\n"
+        f"Link: {resume.link}"
+    )
 
 conv_handler = ConversationHandler(
     entry_points=[CommandHandler("search", search_command)],
@@ -142,14 +370,21 @@ conv_handler = ConversationHandler(
         EXPERIENCE: [MessageHandler(filters.TEXT & ~filters.COMMAND, experience_step)],
         ENGLISH_LANGUAGE: [MessageHandler(filters.TEXT & ~filters.COMMAND, english_language_step)],
         KEYWORDS: [MessageHandler(filters.TEXT & ~filters.COMMAND, keywords_step)],
-        SITE_SELECTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, site_selection_step)],
+        # block=False runs the search as a background task, so other updates keep being handled
+        SITE_SELECTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, site_selection_step, block=False)],
     },
     fallbacks=[CommandHandler("start", start_command)]
 )
 
 application.add_handler(CommandHandler("start", start_command))
 application.add_handler(CommandHandler("help", help_command))
+application.add_handler(CommandHandler("refresh", refresh_command, block=False))
 application.add_handler(conv_handler)
 
+if application.job_queue is None:
+    print("JobQueue is not available, cache warming is off. Install python-telegram-bot[job-queue] to enable it.")
+elif cache_warmer.windows:
+    application.job_queue.run_repeating(warm_search_cache, interval=int(os.getenv("WARM_CACHE_INTERVAL", 1800)), first=60)
+
 if __name__ == "__main__":
     application.run_polling()
@@ -0,0 +1,125 @@
+import hashlib
+import random
+import re
+from array import array
+
+from parsers.resume import parse_years, words
+
+# MinHash signatures of NUM_PERM values, split into BANDS bands of ROWS values for LSH. Two resumes
+# become candidates when any band matches, which for 16 bands of 4 is near certain above a Jaccard
+# similarity of 0.8; candidates are then confirmed against THRESHOLD on the full signature.
+NUM_PERM = 64
+ROWS = 4
+BANDS = NUM_PERM // ROWS
+THRESHOLD = 0.8
+MIN_TOKENS = 4  # Resumes with fewer features are too thin to tell apart and are never merged
+
+# Bumped whenever features or banding change, so stored signatures get recomputed
+VERSION = 2
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(1)  # Fixed seed: signatures are stored, so they must not change between runs
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+PARENTHESES_RE = re.compile(r"\([^)]*\)")  # Work.ua job titles end with the job's length in parentheses
+
+
+def jobs(resume):
+    """The exact jobs on a resume: company and length in months, e.g. "job:softserve|27".
+
+    Two resumes are only ever the same candidate when they share one of these, so people with the
+    same title in the same city stay apart. Jobs without a company or a length are left out.
+    """
+    found = set()
+    for entry in resume.experience:
+        company = " ".join(words(entry.name))
+        months = round(parse_years(entry.duration) * 12)
+        if company and months:
+            found.add(f"job:{company}|{months}")
+    return found
+
+
+def features(resume):
+    """City, position, job titles and exact jobs of a resume as a set of tokens.
+
+    Skills are left out: Robota.ua search results have none, so they would keep a candidate's
+    copies on the two sites apart.
+    """
+    tokens = {f"w:{word}" for word in words(resume.position)}
+    city = " ".join(words(resume.location))
+    if city:
+        tokens.add(f"city:{city}")
+    for entry in resume.experience:
+        tokens.update(f"w:{word}" for word in words(PARENTHESES_RE.sub(" ", entry.title)))
+    tokens.update(jobs(resume))
+    return tokens
+
+
+def signature(tokens):
+    """MinHash signature of a non-empty token set."""
+    hashes = [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little") for token in tokens]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(sig):
+    # Tuples of ints hash the same in every process, so the keys can be stored
+    return [hash((band, *sig[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+def similarity(sig_a, sig_b):
+    # Share of equal MinHash values, an estimate of the Jaccard similarity of the token sets
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def comparable(tokens):
+    # Enough to go on, including at least one exact job
+    return len(tokens) >= MIN_TOKENS and any(token.startswith("job:") for token in tokens)
+
+
+def same_candidate(sig_a, jobs_a, sig_b, jobs_b, threshold=THRESHOLD):
+    return not jobs_a.isdisjoint(jobs_b) and similarity(sig_a, sig_b) >= threshold
+
+
+def pack(sig):
+    return array("Q", sig).tobytes()
+
+
+def unpack(blob):
+    return array("Q", blob).tolist()
+
+
+class DuplicateFilter:
+    """Tells whether a resume is the same candidate as one seen before, from either site.
+
+    Each check looks only at the resumes sharing an LSH bucket with it, so its cost doesn't grow
+    with the number of resumes seen.
+    """
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.links = set()
+        self.seen = []  # (signature, jobs) of the resumes kept
+        self.buckets = {}  # band key -> indexes into seen
+
+    def is_duplicate(self, resume):
+        """True for a copy of an earlier resume; otherwise remembers this one and returns False."""
+        if resume.link in self.links:
+            return True
+        self.links.add(resume.link)
+        tokens = features(resume)
+        if not comparable(tokens):
+            return False
+
+        sig = signature(tokens)
+        resume_jobs = {token for token in tokens if token.startswith("job:")}
+        keys = band_keys(sig)
+        candidates = {index for key in keys for index in self.buckets.get(key, ())}
+        for index in candidates:
+            other_sig, other_jobs = self.seen[index]
+            if same_candidate(sig, resume_jobs, other_sig, other_jobs, self.threshold):
+                return True
+
+        self.seen.append((sig, resume_jobs))
+        for key in keys:
+            self.buckets.setdefault(key, []).append(len(self.seen) - 1)
+        return False
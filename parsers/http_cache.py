@@ -0,0 +1,190 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Endpoints worth caching: (name, URL pattern, environment variable for the TTL, default TTL in seconds).
+# Anything that matches no rule goes straight to the network.
+TTL_RULES = [
+    ("work_ua_resume", re.compile(r"^https://www\.work\.ua/resumes/\d+"), "HTTP_CACHE_TTL_WORK_UA_RESUME", 6 * 3600),
+    ("work_ua_search", re.compile(r"^https://www\.work\.ua/resumes-"), "HTTP_CACHE_TTL_WORK_UA_SEARCH", 10 * 60),
+    ("robota_ua_search", re.compile(r"^https://employer-api\.robota\.ua/cvdb/resumes"), "HTTP_CACHE_TTL_ROBOTA_UA_SEARCH", 10 * 60),
+]
+
+DEFAULT_PATH = os.path.join(".cache", "http_responses.sqlite3")
+
+
+class CachedResponse:
+    """Stands in for a requests/httpx response when the body comes from the cache."""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, text, headers):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        pass  # Only successful responses are stored
+
+
+class CacheLookup:
+    __slots__ = ("key", "url", "ttl", "entry")
+
+    def __init__(self, key, url, ttl, entry):
+        self.key = key
+        self.url = url
+        self.ttl = ttl
+        self.entry = entry  # Row from the cache, fresh or stale, or None
+
+    def is_fresh(self):
+        return self.entry is not None and self.entry["expires_at"] > time.time()
+
+    def response(self):
+        entry = self.entry
+        return CachedResponse(self.url, 200, entry["body"], json.loads(entry["headers"]))
+
+    def conditional_headers(self):
+        # Lets the server answer 304 Not Modified for a stale entry instead of resending the body
+        headers = {}
+        if self.entry is not None:
+            if self.entry["etag"]:
+                headers["If-None-Match"] = self.entry["etag"]
+            if self.entry["last_modified"]:
+                headers["If-Modified-Since"] = self.entry["last_modified"]
+        return headers
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with per-endpoint TTLs, revalidation and size-bounded LRU eviction."""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=200 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {name: float(os.getenv(env_name, default)) for name, _, env_name, default in TTL_RULES}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT, headers TEXT, etag TEXT, last_modified TEXT,"
+            " expires_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.commit()
+
+    def ttl_for(self, url):
+        for name, pattern, _, _ in TTL_RULES:
+            if pattern.match(url):
+                return self.ttls[name]
+        return None
+
+    def lookup(self, method, url, payload=None):
+        """Returns a CacheLookup for cacheable requests, None for everything else."""
+        ttl = self.ttl_for(url)
+        if not ttl:
+            return None
+
+        key = f"{method} {url}"
+        if payload is not None:
+            # Canonical JSON, so the same search is one entry regardless of key order
+            key += " " + json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+        with self._lock:
+            entry = self._db.execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+            if entry is not None:
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        return CacheLookup(key, url, ttl, entry)
+
+    def complete(self, lookup, response):
+        """Store or refresh the entry after a network response; returns the response to hand back."""
+        if response.status_code == 304 and lookup.entry is not None:
+            with self._lock:
+                self._db.execute(
+                    "UPDATE responses SET expires_at = ? WHERE key = ?", (time.time() + lookup.ttl, lookup.key)
+                )
+                self._db.commit()
+            return lookup.response()
+
+        if response.status_code == 200 and "no-store" not in response.headers.get("cache-control", ""):
+            self.store(lookup, response)
+        return response
+
+    def store(self, lookup, response):
+        body = response.text
+        headers = {"content-type": response.headers.get("content-type", "")}
+        now = time.time()
+        size = len(body.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    lookup.key, body, json.dumps(headers),
+                    response.headers.get("etag"), response.headers.get("last-modified"),
+                    now + lookup.ttl, now, size,
+                ),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until the cache fits in max_bytes again
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 50"
+            ).fetchall()
+            if not oldest:
+                break
+            for row in oldest:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (row["key"],))
+                total -= row["size"]
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The process-wide cache, configured by HTTP_CACHE_PATH (empty disables it) and HTTP_CACHE_MAX_MB."""
+    global _cache
+    if _cache is None:
+        path = os.getenv("HTTP_CACHE_PATH", DEFAULT_PATH)
+        if not path:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                max_bytes = int(float(os.getenv("HTTP_CACHE_MAX_MB", 200)) * 1024 * 1024)
+                _cache = ResponseCache(path, max_bytes)
+    return _cache
+
+
+def close():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
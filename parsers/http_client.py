@@ -0,0 +1,338 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from parsers import http_cache, rate_limit, retry
+
+# Both requests (via urllib3) and httpx only decode "br" when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# Pool settings: (environment variable, type, default), overridable with configure()
+SETTINGS = {
+    # Async client: connections across all hosts. Sync session: hosts whose pools are kept, each
+    # holding up to max_per_host connections (requests/urllib3 has no cap across hosts).
+    "pool_size": ("HTTP_POOL_SIZE", int, 20),
+    "max_per_host": ("HTTP_MAX_PER_HOST", int, 10),  # Concurrent connections to one host
+    "keepalive_expiry": ("HTTP_KEEPALIVE_EXPIRY", float, 30),  # Seconds an idle connection is kept
+    "timeout": ("HTTP_TIMEOUT", float, 20),
+    "retries": ("HTTP_RETRIES", int, 3),  # Extra attempts after a network error or a 429/5xx
+    "retry_backoff": ("HTTP_RETRY_BACKOFF", float, 0.5),  # Seconds, doubled on every attempt
+    "retry_backoff_max": ("HTTP_RETRY_BACKOFF_MAX", float, 10),
+    "retry_after_max": ("HTTP_RETRY_AFTER_MAX", float, 30),  # Longer Retry-After values are not waited out
+    "hedge": ("HTTP_HEDGE", int, 0),  # 1 sends a second GET when the first is slower than the host's p95
+    "hedge_quantile": ("HTTP_HEDGE_QUANTILE", float, 0.95),
+    "hedge_min_samples": ("HTTP_HEDGE_MIN_SAMPLES", int, 20),
+}
+settings = {}
+
+_session = None
+_session_lock = threading.Lock()
+
+_async_client = None
+_async_loop = None
+
+# Set by count_requests(); tasks and to_thread calls started inside it inherit the counter
+_request_counter = contextvars.ContextVar("request_counter", default=None)
+# Set by no_cache(), inherited the same way
+_no_cache = contextvars.ContextVar("no_cache", default=False)
+
+
+def configure(**options):
+    """Override pool, retry and hedging settings; must be called before the first request."""
+    unknown = set(options) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown HTTP client settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+
+
+def setting(name):
+    # Read lazily so values from a .env loaded after import are still picked up
+    if name not in settings:
+        env_name, cast, default = SETTINGS[name]
+        settings[name] = cast(os.getenv(env_name, default))
+    return settings[name]
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # pool_connections is the number of per-host pools urllib3 keeps, not a connection
+                # total; pool_block makes max_per_host a hard cap instead of opening throwaway connections
+                adapter = HTTPAdapter(
+                    pool_connections=setting("pool_size"),
+                    pool_maxsize=setting("max_per_host"),
+                    pool_block=True,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+                _session = session
+    return _session
+
+
+def get_async_client():
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    # httpx connections are bound to the loop that created them
+    if _async_client is None or _async_loop is not loop:
+        if _async_client is not None:
+            _discard_async_client(_async_client, _async_loop)
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=setting("pool_size"),
+                max_keepalive_connections=setting("pool_size"),
+                keepalive_expiry=setting("keepalive_expiry"),
+            ),
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            timeout=setting("timeout"),
+            follow_redirects=True,
+        )
+        _async_loop = loop
+    return _async_client
+
+
+def _discard_async_client(client, loop):
+    # Connections can only be closed on the loop that opened them. A loop still running in another
+    # thread closes them there. A closed loop (e.g. after asyncio.run) can't run anything any more:
+    # its sockets are closed when the client is garbage collected, so code that runs its own event
+    # loops should await aclose() before each loop ends, as main.py does on shutdown.
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+@contextmanager
+def count_requests():
+    """Counts requests that actually go out to the network (not cache hits) made inside the block."""
+    counter = {"requests": 0}
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
+
+
+@contextmanager
+def no_cache():
+    """Cached responses are revalidated with the site before use inside the block, even fresh ones.
+
+    Like Cache-Control: no-cache, an unchanged page still costs only a 304.
+    """
+    token = _no_cache.set(True)
+    try:
+        yield
+    finally:
+        _no_cache.reset(token)
+
+
+def _count_request():
+    counter = _request_counter.get()
+    if counter is not None:
+        counter["requests"] += 1
+
+
+def host_limiter(url):
+    # Token bucket plus AIMD concurrency per host; the concurrency never exceeds max_per_host
+    return rate_limit.get_host_limiter(urlsplit(url).netloc, setting("max_per_host"))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+async def aget(url, **kwargs):
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url, **kwargs):
+    return await arequest("POST", url, **kwargs)
+
+
+def retry_policy(retries=None):
+    return retry.RetryPolicy(
+        retries=setting("retries") if retries is None else retries,
+        backoff_base=setting("retry_backoff"),
+        backoff_max=setting("retry_backoff_max"),
+        max_retry_after=setting("retry_after_max"),
+    )
+
+
+def request(method, url, retries=None, **kwargs):
+    # Fresh cache entries skip the network, stale ones are revalidated with ETag/Last-Modified
+    cache = http_cache.get_response_cache()
+    lookup = cache.lookup(method, url, kwargs.get("json")) if cache else None
+    if lookup is not None and lookup.is_fresh() and not _no_cache.get():
+        return lookup.response()
+    if lookup is not None:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **lookup.conditional_headers()}
+
+    kwargs.setdefault("timeout", setting("timeout"))
+    policy = retry_policy(retries)
+    attempt = 0
+    while True:
+        response, error = None, None
+        try:
+            response = _send(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        delay = policy.delay(attempt, response, error)
+        if delay is None:
+            break
+        print(f"Retrying {url} in {delay:.1f}s after {error or response.status_code}")
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+    if error is not None:
+        raise error
+    return cache.complete(lookup, response) if lookup is not None else response
+
+
+async def arequest(method, url, retries=None, hedge=None, **kwargs):
+    cache = http_cache.get_response_cache()
+    lookup = await asyncio.to_thread(cache.lookup, method, url, kwargs.get("json")) if cache else None
+    if lookup is not None and lookup.is_fresh() and not _no_cache.get():
+        return lookup.response()
+    if lookup is not None:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **lookup.conditional_headers()}
+
+    # Only GETs are hedged, a duplicate POST isn't safe in general
+    hedge = setting("hedge") if hedge is None else hedge
+    send = _asend_hedged if hedge and method == "GET" else _asend
+    policy = retry_policy(retries)
+    attempt = 0
+    while True:
+        response, error = None, None
+        try:
+            response = await send(method, url, **kwargs)
+        except httpx.TransportError as e:  # Connection errors and timeouts
+            error = e
+
+        delay = policy.delay(attempt, response, error)
+        if delay is None:
+            break
+        print(f"Retrying {url} in {delay:.1f}s after {error or response.status_code}")
+        if response is not None:
+            await response.aclose()
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    if error is not None:
+        raise error
+    return await asyncio.to_thread(cache.complete, lookup, response) if lookup is not None else response
+
+
+def _send(method, url, **kwargs):
+    limiter = host_limiter(url)
+    limiter.acquire()
+    _count_request()
+    started = time.monotonic()
+    status_code = None
+    try:
+        response = get_session().request(method, url, **kwargs)
+        status_code = response.status_code
+    finally:
+        latency = time.monotonic() - started
+        limiter.release(latency, status_code)
+    if status_code < 500:
+        retry.get_latency_tracker(urlsplit(url).netloc).add(latency)
+    return response
+
+
+async def _asend(method, url, sent=None, **kwargs):
+    client = get_async_client()
+    limiter = host_limiter(url)
+    await limiter.aacquire()
+    _count_request()
+    started = time.monotonic()
+    if sent is not None:
+        sent["at"] = started
+    status_code = None
+    try:
+        response = await client.request(method, url, **kwargs)
+        status_code = response.status_code
+    except asyncio.CancelledError:
+        # A hedge that lost the race says nothing about the host's health
+        limiter.release(cancelled=True)
+        raise
+    except BaseException:
+        limiter.release(time.monotonic() - started, None)
+        raise
+    latency = time.monotonic() - started
+    limiter.release(latency, status_code)
+    if status_code < 500:
+        retry.get_latency_tracker(urlsplit(url).netloc).add(latency)
+    return response
+
+
+async def _asend_hedged(method, url, **kwargs):
+    # Once the request is slower than most recent ones to the same host, race a duplicate against it
+    threshold = retry.get_latency_tracker(urlsplit(url).netloc).quantile(
+        setting("hedge_quantile"), setting("hedge_min_samples")
+    )
+    if threshold is None:
+        return await _asend(method, url, **kwargs)
+
+    sent = {}
+    first = asyncio.ensure_future(_asend(method, url, sent, **kwargs))
+    while True:
+        # Time spent queued in the rate limiter doesn't count, only time on the wire
+        elapsed = time.monotonic() - sent["at"] if "at" in sent else 0
+        if "at" in sent and elapsed >= threshold:
+            break
+        done, _ = await asyncio.wait({first}, timeout=threshold - elapsed)
+        if done:
+            return first.result()
+
+    pending = {first, asyncio.ensure_future(_asend(method, url, **kwargs))}
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                return done.pop().result()  # Both failed, let the caller's retry loop see the error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def close():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+async def aclose():
+    global _async_client, _async_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+        _async_loop = None
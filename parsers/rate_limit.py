@@ -0,0 +1,178 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+# Requests per second and burst size per host; HTTP_RATE_LIMITS="host=rate/burst,..." overrides them
+DEFAULT_RATE_LIMITS = {
+    "www.work.ua": (5.0, 10),
+    "employer-api.robota.ua": (3.0, 6),
+}
+FALLBACK_RATE_LIMIT = (10.0, 20)
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class TokenBucket:
+    """Token bucket shared by threads and coroutines; callers reserve a token and sleep until it is due."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token and returns how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1  # May go negative: later callers queue behind earlier ones
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight to one host.
+
+    The limit grows by about one per round trip while responses are fast and healthy, and is
+    halved on 429/503, network errors or latency well above the usual, at most once per cooldown.
+    "The usual" is a slow moving average of every healthy response time and "the current" a fast
+    one, so a lasting change in the host's latency is taken as the new usual within a few dozen
+    responses instead of counting as slow forever.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=10, backoff=0.5, latency_tolerance=2.0, cooldown=1.0,
+                 baseline_weight=0.05, recent_weight=0.3):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.baseline_weight = baseline_weight
+        self.recent_weight = recent_weight
+        self.baseline_latency = None  # Slow moving average of healthy response times
+        self.recent_latency = None  # Fast moving average of the same
+        self.last_decrease = 0.0
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()  # (loop, future) of coroutines waiting for a slot
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, latency=None, status_code=None, cancelled=False):
+        """Frees the slot and feeds the outcome back; status_code None means the request failed."""
+        with self._lock:
+            self.in_flight -= 1
+            if cancelled:
+                pass
+            elif status_code is None or status_code in THROTTLE_STATUSES:
+                self._decrease()
+            elif latency is not None:
+                self._observe(latency)
+
+            self._condition.notify_all()
+            while self._async_waiters:
+                loop, waiter = self._async_waiters.popleft()
+                loop.call_soon_threadsafe(_wake, waiter)
+
+    def _observe(self, latency):
+        if self.baseline_latency is None:
+            self.baseline_latency = self.recent_latency = latency
+        else:
+            self.baseline_latency += self.baseline_weight * (latency - self.baseline_latency)
+            self.recent_latency += self.recent_weight * (latency - self.recent_latency)
+        if self.recent_latency > self.baseline_latency * self.latency_tolerance:
+            self._decrease()
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self.last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+            self.last_decrease = now
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class HostLimiter:
+    """Rate limit plus adaptive concurrency for one host."""
+
+    def __init__(self, rate, burst, max_concurrency):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(initial=min(4, max_concurrency), maximum=max_concurrency)
+
+    def acquire(self):
+        self.concurrency.acquire()
+        self.bucket.acquire()
+
+    async def aacquire(self):
+        await self.concurrency.aacquire()
+        try:
+            await self.bucket.aacquire()
+        except asyncio.CancelledError:
+            self.concurrency.release(cancelled=True)
+            raise
+
+    def release(self, latency=None, status_code=None, cancelled=False):
+        self.concurrency.release(latency, status_code, cancelled)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def configured_rate_limits():
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in os.getenv("HTTP_RATE_LIMITS", "").split(","):
+        if "=" not in item:
+            continue
+        host, value = item.split("=", 1)
+        rate, _, burst = value.partition("/")
+        limits[host.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+def get_host_limiter(host, max_concurrency):
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                rate, burst = configured_rate_limits().get(host, FALLBACK_RATE_LIMIT)
+                limiter = _limiters[host] = HostLimiter(rate, burst, max_concurrency)
+    return limiter
@@ -0,0 +1,39 @@
+import importlib
+import threading
+
+# Site name -> "module:class" of its ResumeSource. Modules are imported on first use, so adding
+# a site here costs nothing at startup and needs no changes to the bot's handlers.
+SOURCES = {
+    "Work.ua": "parsers.work_ua_parser:WorkUaParser",
+    "Robota.ua": "parsers.robota_ua_parser:RobotaUaParser",
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def register(site_name, path):
+    SOURCES[site_name] = path
+    _loaded.pop(site_name, None)
+
+
+def source_names():
+    return list(SOURCES)
+
+
+def get_source(site_name):
+    """The ResumeSource class for site_name, importing its module if needed."""
+    source = _loaded.get(site_name)
+    if source is None:
+        with _lock:
+            source = _loaded.get(site_name)
+            if source is None:
+                if site_name not in SOURCES:
+                    raise KeyError(f"Unknown resume site: {site_name}")
+                module_name, class_name = SOURCES[site_name].split(":")
+                source = _loaded[site_name] = getattr(importlib.import_module(module_name), class_name)
+    return source
+
+
+def create(site_name, **filters):
+    return get_source(site_name)(**filters)
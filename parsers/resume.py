@@ -0,0 +1,153 @@
+import json
+import re
+import sys
+from dataclasses import dataclass
+
+NOT_SPECIFIED = "Not specified"
+
+# Shorter strings are interned: city names, durations, companies, skills and NOT_SPECIFIED repeat
+# across thousands of resumes and are then stored once. Long free text is left alone.
+INTERN_MAX_LENGTH = 100
+
+
+def intern_text(value):
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+# Durations as both sites write them, in Ukrainian, Russian or English
+YEARS_RE = re.compile(r"(\d+)\s*(?:рок|рік|лет|год|year)", re.I)
+MONTHS_RE = re.compile(r"(\d+)\s*(?:міс|мес|month)", re.I)
+# A number with its thousands optionally split by spaces, e.g. "25 000" (often a no-break space)
+SALARY_RE = re.compile(r"\d+(?:\s\d{3})*")
+
+
+# Words of free text as the ranking, duplicate detection and the resume store see them. The
+# parsers' placeholders for missing fields ("Not specified", "N/A") are not words.
+WORD_RE = re.compile(r"\w+")
+IGNORED = {"not", "specified", "n", "a"}
+
+
+def words(text):
+    return [word for word in WORD_RE.findall(text.casefold()) if word not in IGNORED]
+
+
+def parse_salary(value):
+    # The first number, so a range like "від 20 000 до 30 000 грн" gives its lower end
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = SALARY_RE.search(str(value or ""))
+    return int(re.sub(r"\s", "", match[0])) if match else None
+
+
+def parse_years(text):
+    # "2 роки 3 місяці" -> 2.25
+    years = sum(int(n) for n in YEARS_RE.findall(text))
+    months = sum(int(n) for n in MONTHS_RE.findall(text))
+    return years + months / 12
+
+
+def experience_years(resume):
+    # Work.ua titles repeat the duration, so only the duration field is counted
+    return sum(parse_years(entry.duration) for entry in resume.experience)
+
+
+@dataclass(slots=True)
+class ExperienceEntry:
+    """One job or course on a resume."""
+
+    title: str = NOT_SPECIFIED
+    name: str = NOT_SPECIFIED  # Company or school
+    duration: str = NOT_SPECIFIED
+    additional_info: str = NOT_SPECIFIED
+
+    def __post_init__(self):
+        self.title = intern_text(self.title)
+        self.name = intern_text(self.name)
+        self.duration = intern_text(self.duration)
+        self.additional_info = intern_text(self.additional_info)
+
+    def __reduce__(self):
+        # Rebuilt through __init__ when unpickled (e.g. coming back from a parser process), so strings get interned
+        return ExperienceEntry, (self.title, self.name, self.duration, self.additional_info)
+
+    def summary(self):
+        return f"{self.title} at {self.name} ({self.duration})"
+
+
+@dataclass(slots=True)
+class Resume:
+    """A resume from any site, in the same shape whichever parser produced it."""
+
+    position: str = NOT_SPECIFIED
+    location: str = NOT_SPECIFIED
+    salary_expectation: str = NOT_SPECIFIED
+    skills: tuple = ()
+    experience: tuple = ()  # ExperienceEntry, in the order the resume lists them
+    add_info: str = NOT_SPECIFIED
+    link: str = ""
+    site: str = ""
+
+    def __post_init__(self):
+        self.position = intern_text(self.position)
+        self.location = intern_text(self.location)
+        self.salary_expectation = intern_text(str(self.salary_expectation))
+        self.skills = tuple(intern_text(skill) for skill in self.skills)
+        self.experience = tuple(self.experience)
+        self.add_info = intern_text(self.add_info)
+        self.site = intern_text(self.site)
+
+    def __reduce__(self):
+        return Resume, (
+            self.position, self.location, self.salary_expectation, self.skills,
+            self.experience, self.add_info, self.link, self.site,
+        )
+
+    def __str__(self):
+        resume_str = f"Position: {self.position}\n"
+        resume_str += f"Salary Expectation: {self.salary_expectation}\n"
+        resume_str += f"Location: {self.location}\n"
+        resume_str += f"Additional Info: {self.add_info}\n"
+        resume_str += f"Skills: {', '.join(self.skills)}\n"
+        resume_str += f"Experience:\n"
+        for entry in self.experience:
+            resume_str += f"\t{entry.summary()}\n"
+        return resume_str
+
+    def to_json(self):
+        # Positional rather than keyed, which keeps cache rows small and quick to write and read
+        return json.dumps([
+            self.position, self.location, self.salary_expectation, self.skills,
+            [[entry.title, entry.name, entry.duration, entry.additional_info] for entry in self.experience],
+            self.add_info, self.link, self.site,
+        ], ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        position, location, salary, skills, experience, add_info, link, site = data
+        return cls(position, location, salary, skills, [ExperienceEntry(*entry) for entry in experience], add_info, link, site)
+
+    @classmethod
+    def from_dict(cls, data):
+        # Resumes cached as dicts before this model existed
+        link = data.get("link", "")
+        return cls(
+            position=data.get("position", NOT_SPECIFIED),
+            location=data.get("location", NOT_SPECIFIED),
+            salary_expectation=data.get("salary_expectation", NOT_SPECIFIED),
+            skills=data.get("skills") or (),
+            experience=[
+                ExperienceEntry(
+                    job.get("title", NOT_SPECIFIED), job.get("name", NOT_SPECIFIED),
+                    job.get("duration", NOT_SPECIFIED), job.get("additional_info", NOT_SPECIFIED),
+                )
+                for job in data.get("jobs_and_education") or ()
+            ],
+            add_info=data.get("add_info", NOT_SPECIFIED),
+            link=link,
+            site=data.get("site") or ("Work.ua" if "work.ua" in link else "Robota.ua"),
+        )
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from parsers.resume import Resume
+
+DEFAULT_PATH = os.path.join(".cache", "parsed_resumes.sqlite3")
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResumeCache:
+    """Parsed resumes keyed by resume URL and a hash of the page they were parsed from.
+
+    An in-memory LRU sits in front of an optional SQLite tier, so a page that hasn't changed
+    is never parsed twice, even across restarts. Returned resumes are shared and must not be modified.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, memory_size=2000, max_entries=100000):
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (content hash, resume)
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                " key TEXT PRIMARY KEY, content_hash TEXT, data TEXT, last_access REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS resumes_last_access ON resumes (last_access)")
+            self._db.commit()
+
+    def get(self, key, digest):
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == digest:
+                self._memory.move_to_end(key)
+                return cached[1]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT data FROM resumes WHERE key = ? AND content_hash = ?", (key, digest)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE resumes SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            resume = Resume.from_json(row[0])
+            self._remember(key, digest, resume)
+            return resume
+
+    def put(self, key, digest, resume):
+        with self._lock:
+            self._remember(key, digest, resume)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?)",
+                (key, digest, resume.to_json(), time.time()),
+            )
+            count = self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM resumes WHERE key IN (SELECT key FROM resumes ORDER BY last_access LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+
+    def _remember(self, key, digest, resume):
+        self._memory[key] = (digest, resume)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache():
+    """The process-wide cache; RESUME_CACHE_PATH sets the SQLite file (empty keeps it in memory only)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResumeCache(
+                    path=os.getenv("RESUME_CACHE_PATH", DEFAULT_PATH),
+                    memory_size=int(os.getenv("RESUME_CACHE_MEMORY_SIZE", 2000)),
+                )
+    return _cache
+
+
+def close():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
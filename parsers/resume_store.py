@@ -0,0 +1,287 @@
+import os
+import sqlite3
+import threading
+import time
+
+from parsers import dedup
+from parsers.resume import WORD_RE, Resume, experience_years, parse_salary
+
+DEFAULT_PATH = os.path.join(".cache", "resumes.sqlite3")
+
+# Placeholders the parsers use for missing fields; they are not worth indexing
+MISSING_VALUES = {"", "Not specified", "N/A"}
+
+# City names as users type them (and as Work.ua/Robota.ua slugs) next to how resumes spell them
+CITY_ALIASES = {
+    "kyiv": ("київ", "киев"),
+    "lviv": ("львів", "львов"),
+    "odesa": ("одеса", "одесса"),
+    "dnipro": ("дніпро", "днепр"),
+    "kharkiv": ("харків", "харьков"),
+    "zaporizhia": ("запоріжжя", "запорожье"),
+}
+ANYWHERE = {"ukraine", "україна", "украина"}
+
+
+def experience_text(resume):
+    return [searchable(entry.title, entry.name, entry.additional_info, entry.duration) for entry in resume.experience]
+
+
+def searchable(*values):
+    return " ".join(str(value) for value in values if str(value).strip() not in MISSING_VALUES)
+
+
+def match_terms(text):
+    # Prefix match on every word, so "дизайн" finds "дизайнер" and "дизайнерка"
+    return " AND ".join(f'"{word}"*' for word in WORD_RE.findall(text.casefold()))
+
+
+class ResumeStore:
+    """Every parsed resume from both sites, with an FTS5 index for answering searches locally.
+
+    Resumes are keyed by link, so seeing one again updates it in place and refreshes seen_at.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " id INTEGER PRIMARY KEY, link TEXT UNIQUE, site TEXT, location TEXT, salary INTEGER,"
+            " experience_years REAL, data TEXT, seen_at REAL, signature BLOB, candidate_id INTEGER)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(resumes)")}
+        for column, column_type in (("signature", "BLOB"), ("candidate_id", "INTEGER")):
+            if column not in columns:  # Stores created before near-duplicate detection
+                self._db.execute(f"ALTER TABLE resumes ADD COLUMN {column} {column_type}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS resumes_seen_at ON resumes (seen_at)")
+        # MinHash LSH buckets: resumes sharing a band key are checked for being the same candidate
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resume_bands ("
+            " band_key INTEGER, resume_id INTEGER, PRIMARY KEY (band_key, resume_id)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS resume_bands_resume_id ON resume_bands (resume_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS resumes_candidate_id ON resumes (candidate_id)")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < dedup.VERSION:
+            # Signatures of older features can't be compared with new ones: every resume becomes its
+            # own candidate again and is grouped anew the next time it is seen
+            self._db.execute("DELETE FROM resume_bands")
+            self._db.execute("UPDATE resumes SET signature = NULL, candidate_id = id")
+            self._db.execute(f"PRAGMA user_version = {dedup.VERSION}")
+        # What each incremental crawl has already seen: resume ID or link, and its version (e.g. update date)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_state ("
+            " query TEXT, item_id TEXT, version TEXT, seen_at REAL, PRIMARY KEY (query, item_id))"
+        )
+        # rowid of the index row is resumes.id
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5("
+            " position, skills, experience, add_info, tokenize='unicode61 remove_diacritics 2')"
+        )
+        self._db.commit()
+
+    def add(self, site, resume):
+        self.add_many(site, [resume])
+
+    def add_many(self, site, resumes):
+        now = time.time()
+        with self._lock:
+            for resume in resumes:
+                self._upsert(site, resume, now)
+            self._db.commit()
+
+    def _upsert(self, site, resume, now):
+        row = (
+            site.casefold(),
+            resume.location.casefold().strip(),
+            parse_salary(resume.salary_expectation),
+            experience_years(resume),
+            resume.to_json(),
+            now,
+        )
+        text = (
+            searchable(resume.position),
+            searchable(*resume.skills),
+            searchable(*experience_text(resume)),
+            searchable(resume.add_info),
+        )
+
+        existing = self._db.execute("SELECT id FROM resumes WHERE link = ?", (resume.link,)).fetchone()
+        if existing is None:
+            cursor = self._db.execute(
+                "INSERT INTO resumes (site, location, salary, experience_years, data, seen_at, link)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*row, resume.link),
+            )
+            resume_id = cursor.lastrowid
+        else:
+            resume_id = existing[0]
+            self._db.execute(
+                "UPDATE resumes SET site = ?, location = ?, salary = ?, experience_years = ?, data = ?, seen_at = ?"
+                " WHERE id = ?",
+                (*row, resume_id),
+            )
+            self._db.execute("DELETE FROM resumes_fts WHERE rowid = ?", (resume_id,))
+        self._db.execute(
+            "INSERT INTO resumes_fts (rowid, position, skills, experience, add_info) VALUES (?, ?, ?, ?, ?)",
+            (resume_id, *text),
+        )
+        self._assign_candidate(resume_id, resume)
+
+    def _assign_candidate(self, resume_id, resume):
+        # Copies of the same candidate (on the other site, or under another link) share a candidate_id.
+        # Only resumes in the same LSH buckets are looked at, not the whole store. A resume joins a
+        # candidate only when it is a copy of every resume already under it, so unrelated resumes
+        # can't chain into one candidate through a resume that looks a bit like each of them.
+        self._db.execute("DELETE FROM resume_bands WHERE resume_id = ?", (resume_id,))
+        tokens = dedup.features(resume)
+        if not dedup.comparable(tokens):
+            self._db.execute("UPDATE resumes SET signature = NULL, candidate_id = ? WHERE id = ?", (resume_id, resume_id))
+            return
+
+        sig = dedup.signature(tokens)
+        resume_jobs = dedup.jobs(resume)
+        keys = dedup.band_keys(sig)
+        rows = self._db.execute(
+            "SELECT signature, candidate_id FROM resumes WHERE id IN ("
+            " SELECT DISTINCT resume_id FROM resume_bands WHERE band_key IN (%s)) AND id != ?"
+            % ",".join("?" * len(keys)),
+            (*keys, resume_id),
+        ).fetchall()
+        best = {}  # candidate_id -> highest similarity of its resumes in our buckets
+        for other_signature, other_candidate in rows:
+            score = dedup.similarity(sig, dedup.unpack(other_signature))
+            if score >= dedup.THRESHOLD and score > best.get(other_candidate, 0):
+                best[other_candidate] = score
+
+        candidate_id = resume_id
+        for other_candidate in sorted(best, key=best.get, reverse=True):
+            members = self._db.execute(
+                "SELECT signature, data FROM resumes WHERE candidate_id = ? AND id != ?", (other_candidate, resume_id)
+            ).fetchall()
+            if all(
+                other_signature is not None
+                and dedup.same_candidate(sig, resume_jobs, dedup.unpack(other_signature), dedup.jobs(Resume.from_json(data)))
+                for other_signature, data in members
+            ):
+                candidate_id = other_candidate
+                break
+
+        self._db.execute(
+            "UPDATE resumes SET signature = ?, candidate_id = ? WHERE id = ?", (dedup.pack(sig), candidate_id, resume_id)
+        )
+        self._db.executemany("INSERT INTO resume_bands VALUES (?, ?)", [(key, resume_id) for key in keys])
+
+    def search(self, job_position=None, location=None, salary=None, years_of_experience=None,
+               english_language=None, keywords=None, site=None, max_age=None, limit=10):
+        """Stored resumes matching the bot's search filters (see search.query.normalize_query), best matches first.
+
+        job_position is matched against the resume title and keywords against all indexed text;
+        salary is the most a candidate may ask for and years_of_experience the least they must have.
+        Resumes with no salary are kept, like the live searches do. Each candidate is returned once,
+        even when both sites (or several links) have their resume.
+        """
+        match = []
+        if job_position and match_terms(job_position):
+            match.append(f"{{position}} : ({match_terms(job_position)})")
+        if keywords and match_terms(keywords):
+            match.append(f"({match_terms(keywords)})")
+        if english_language:
+            match.append('("англ"* OR "english"*)')
+
+        conditions, params = [], []
+        if match:
+            conditions.append("resumes_fts MATCH ?")
+            params.append(" AND ".join(match))
+        if site:
+            conditions.append("resumes.site = ?")
+            params.append(site.casefold())
+        if location and location.casefold() not in ANYWHERE:
+            names = (location.casefold(), *CITY_ALIASES.get(location.casefold(), ()))
+            conditions.append("(" + " OR ".join("resumes.location LIKE ?" for _ in names) + ")")
+            params.extend(f"%{name}%" for name in names)
+        if salary:
+            conditions.append("(resumes.salary IS NULL OR resumes.salary <= ?)")
+            params.append(int(salary))
+        if years_of_experience:
+            conditions.append("resumes.experience_years >= ?")
+            params.append(float(years_of_experience))
+        if max_age:
+            conditions.append("resumes.seen_at >= ?")
+            params.append(time.time() - max_age)
+
+        sql = "SELECT resumes.data, resumes.candidate_id FROM resumes"
+        if match:
+            sql += " JOIN resumes_fts ON resumes_fts.rowid = resumes.id"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY bm25(resumes_fts)" if match else " ORDER BY resumes.seen_at DESC"
+        sql += " LIMIT ?"
+        params.append(limit * 3)  # Room for copies of the same candidate, which are dropped below
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        resumes, candidates = [], set()
+        for data, candidate_id in rows:
+            if candidate_id is not None and candidate_id in candidates:
+                continue
+            candidates.add(candidate_id)
+            resumes.append(Resume.from_json(data))
+            if len(resumes) == limit:
+                break
+        return resumes
+
+    def crawl_seen(self, query):
+        """{item ID: version} of everything the crawl for query has already fetched."""
+        with self._lock:
+            rows = self._db.execute("SELECT item_id, version FROM crawl_state WHERE query = ?", (query,)).fetchall()
+        return dict(rows)
+
+    def mark_crawled(self, query, items, max_age=90 * 24 * 3600):
+        # Entries not seen for max_age are dropped, so those resumes are fetched once more
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO crawl_state VALUES (?, ?, ?, ?)",
+                [(query, str(item_id), version, now) for item_id, version in items],
+            )
+            self._db.execute("DELETE FROM crawl_state WHERE query = ? AND seen_at < ?", (query, now - max_age))
+            self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_resume_store():
+    """The process-wide store at RESUME_STORE_PATH; an empty path disables it and returns None."""
+    global _store
+    if _store is None:
+        path = os.getenv("RESUME_STORE_PATH", DEFAULT_PATH)
+        if not path:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = ResumeStore(path)
+    return _store
+
+
+def close():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after(response):
+    """Seconds the server asked us to wait, from a Retry-After header in seconds or as an HTTP date."""
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base, maximum):
+    # "Full jitter": a random delay up to the exponential cap, so retrying clients don't move in lockstep
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class RetryPolicy:
+    def __init__(self, retries=3, backoff_base=0.5, backoff_max=10, max_retry_after=30):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt, response=None, error=None):
+        """Seconds to wait before the next attempt, or None to give up and return/raise the last outcome."""
+        if attempt >= self.retries:
+            return None
+        if error is None and response.status_code not in RETRY_STATUSES:
+            return None
+
+        requested = retry_after(response)
+        if requested is not None:
+            return requested if requested <= self.max_retry_after else None
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+
+class LatencyTracker:
+    """Recent response times of one host, used to decide when a request is a straggler."""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency):
+        with self._lock:
+            self._samples.append(latency)
+
+    def quantile(self, q, min_samples):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(host):
+    tracker = _trackers.get(host)
+    if tracker is None:
+        with _trackers_lock:
+            tracker = _trackers.setdefault(host, LatencyTracker())
+    return tracker
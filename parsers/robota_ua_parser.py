@@ -1,7 +1,24 @@
+import asyncio
+import json
+import math
+import httpx
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from parsers import http_client, resume_store
+from parsers.resume import NOT_SPECIFIED, ExperienceEntry, Resume
+from parsers.source import Capabilities, ResumeSource
 
-class RobotaUaParser:
+class RobotaUaParser(ResumeSource):
+    SITE_NAME = "Robota.ua"
+    CAPABILITIES = Capabilities(
+        filters=("job_position", "location", "salary", "experience", "english_language", "keywords"),
+        incremental=True,
+        search_timeout=30,
+    )
+    DEFAULT_SALARY_RANGE = {"from": 20000, "to": 40000}
     BASE_URL = 'https://employer-api.robota.ua/cvdb/resumes'
+    MAX_WORKERS = 5  # Result pages fetched in parallel
     headers = {
         'Origin': 'https://robota.ua',
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:133.0) Gecko/20100101 Firefox/133.0',
@@ -18,13 +35,14 @@ class RobotaUaParser:
         'ukraine': 0
     }
 
-    def __init__(self, job_position, location="-", salary=None, experience=None, english_language=None, keywords=None):
-        self.job_position = job_position if job_position != "-" else "3D Designer"  # Default job position
-        self.location = location if location != "-" else "ukraine"  # Default location
-        self.salary = salary if salary and salary.get("from", 0) != "-" else {"from": 20000, "to": 40000}  # Default salary range
+    def __init__(self, job_position, location=None, salary=None, experience=None, english_language=None, keywords=None, max_workers=MAX_WORKERS):
+        self.job_position = job_position if job_position and job_position != "-" else "3D Designer"  # Default job position
+        self.location = location if location and location != "-" else "ukraine"  # Default location
+        self.salary = self.get_salary_range(salary)
         self.experience = experience if experience != "-" else 2  # Default experience (1-2 years)
-        self.english_language = english_language if english_language != "-" else True  # Default: English is required
-        self.keywords = keywords if keywords != "-" else self.job_position  # Default keyword for search
+        self.english_language = english_language if english_language not in (None, "-") else True  # Default: English is required
+        self.keywords = keywords if keywords and keywords != "-" else self.job_position  # Default keyword for search
+        self.max_workers = max_workers if max_workers and max_workers > 0 else 1
 
         self.resumes = []
 
@@ -61,6 +79,14 @@ class RobotaUaParser:
             "searchContext": "Main"
         }
 
+    def get_salary_range(self, salary):
+        # The API filters on a range; an expected salary is searched as an exact one
+        if isinstance(salary, dict):
+            return salary
+        if salary in (None, "", "-"):
+            return dict(self.DEFAULT_SALARY_RANGE)
+        return {"from": int(salary), "to": int(salary)}
+
     def update_payload(self):
         self.payload["keyWords"] = self.keywords if self.keywords != self.job_position else self.job_position
 
@@ -92,32 +118,82 @@ class RobotaUaParser:
         if self.english_language:
             self.payload["languages"] = ["1"]
 
-    def fetch_resumes(self, page=1):  # Default page is 1
+    def build_payload(self, page):
         self.update_payload()
-        self.payload["page"] = page
+        return {**self.payload, "page": page}  # Copy, so concurrent pages don't share state
+
+    def fetch_resumes(self, page=1):  # Default page is 1
+        return self.fetch_page(page)[0]
+
+    async def afetch_resumes(self, page=1):
+        return (await self.afetch_page(page))[0]
+
+    def fetch_page(self, page):
+        """Fetch one result page; returns (resumes, total number of matches or None)."""
+        documents, total = self.fetch_documents(page)
+        resumes = self.parse_documents(documents)
+        store = resume_store.get_resume_store()
+        if store is not None:
+            store.add_many(self.SITE_NAME, resumes)
+        return resumes, total
 
+    async def afetch_page(self, page):
+        documents, total = await self.afetch_documents(page)
+        resumes = self.parse_documents(documents)
+        store = resume_store.get_resume_store()
+        if store is not None:
+            await asyncio.to_thread(store.add_many, self.SITE_NAME, resumes)
+        return resumes, total
+
+    def fetch_documents(self, page):
+        # Raw API documents, which unlike parsed resumes keep resumeId and updateDate
         try:
-            response = requests.post(self.BASE_URL, headers=self.headers, json=self.payload)
+            response = http_client.post(self.BASE_URL, headers=self.headers, json=self.build_payload(page))
             response.raise_for_status()  # Will raise an error for HTTP error codes
 
-            response_data = response.json()
-            print(f"Page {page} response data:")
-            
-            if 'documents' in response_data:
-                documents = response_data['documents']
-                if not documents:
-                    print("No resumes found in the response.")
-                return self.parse_documents(documents)
-            else:
-                print("No documents found in the response.")
-            
+            return self.handle_response_data(response.json(), page)
         except requests.exceptions.RequestException as e:
             print(f"Request failed: {e}")
         except requests.exceptions.JSONDecodeError:
             print("Failed to parse JSON response.")
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
-        return []
+        self.mark_failed()
+        return [], None
+
+    async def afetch_documents(self, page):
+        try:
+            response = await http_client.apost(self.BASE_URL, headers=self.headers, json=self.build_payload(page))
+            response.raise_for_status()  # Will raise an error for HTTP error codes
+
+            return self.handle_response_data(response.json(), page)
+        except httpx.HTTPError as e:
+            print(f"Request failed: {e}")
+        except ValueError:
+            print("Failed to parse JSON response.")
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+        self.mark_failed()
+        return [], None
+
+    def handle_response_data(self, response_data, page):
+        print(f"Page {page} response data:")
+        total = response_data.get('total')
+
+        if 'documents' in response_data:
+            documents = response_data['documents']
+            if not documents:
+                print("No resumes found in the response.")
+            return documents, total
+
+        print("No documents found in the response.")
+        return [], total
+
+    def get_last_page(self, total, page_size, num_pages):
+        # The API reports the total number of matches, so pages past the end are never requested
+        if not total or not page_size:
+            return num_pages
+        return min(num_pages, math.ceil(total / page_size))
 
     def parse_documents(self, documents):
         parsed_resumes = []
@@ -130,20 +206,24 @@ class RobotaUaParser:
             experience = doc.get('experience', [])
             resume_id = doc.get('resumeId', 'N/A')
             
-            experience_info = []
-            for exp in experience:
-                position = exp.get('position', 'N/A')
-                company = exp.get('company', 'N/A')
-                duration = exp.get('datesDiff', 'N/A')
-                experience_info.append(f"{position} at {company} ({duration})")
-
-            resume = {
-                'position': speciality,
-                'location': city,
-                'salary_expectation': salary,
-                'skills': experience_info,
-                'link': f"https://robota.ua/ru/candidates/{resume_id}"
-            }
+            experience_entries = [
+                ExperienceEntry(
+                    title=exp.get('position', 'N/A'),
+                    name=exp.get('company', 'N/A'),
+                    duration=exp.get('datesDiff', 'N/A'),
+                )
+                for exp in experience
+            ]
+
+            resume = Resume(
+                position=speciality,
+                location=city,
+                salary_expectation=salary,
+                experience=experience_entries,
+                add_info=NOT_SPECIFIED,
+                link=f"https://robota.ua/ru/candidates/{resume_id}",
+                site=self.SITE_NAME,
+            )
 
             parsed_resumes.append(resume)
 
@@ -154,22 +234,150 @@ class RobotaUaParser:
             resume_str += f"Age: {age}\n"
             resume_str += f"Salary: {salary}\n"
             resume_str += f"Experience:\n"
-            for exp in experience_info:
-                resume_str += f"\t{exp}\n"
+            for entry in resume.experience:
+                resume_str += f"\t{entry.summary()}\n"
             resume_str += f"Resume url: https://robota.ua/ru/candidates/{resume_id}\n"
             print(resume_str)
 
         return parsed_resumes
 
-    def fetch_multiple_pages(self, num_pages=10):
-        all_resumes = []
+    def crawl_key(self):
+        # Identifies the search, not the page, so every crawl of the same filters shares its state
+        return self.SITE_NAME + " " + json.dumps(self.build_payload(0), sort_keys=True, ensure_ascii=False)
+
+    def crawl(self, num_pages=10):
+        """Incremental fetch: only resumes that are new or updated since the last crawl of this search.
+
+        Results are sorted by UpdateDate, so paging stops at the first resume whose update date is
+        already known; everything after it was seen by an earlier crawl.
+        """
+        self.failed = []
+        store = resume_store.get_resume_store()
+        key = self.crawl_key()
+        seen = store.crawl_seen(key) if store is not None else {}
+
+        new_documents = []
+        page_size = None
         for page in range(1, num_pages + 1):
+            print(f"Crawling page {page}...")
+            documents, total = self.fetch_documents(page)
+            if self.collect_unseen(documents, seen, new_documents):
+                break
+            page_size = page_size or len(documents)  # Page 1's; the last page is shorter
+            if page >= self.get_last_page(total, page_size, num_pages):
+                break
+        return self.finish_crawl(store, key, new_documents)
+
+    async def acrawl(self, num_pages=10):
+        self.failed = []
+        store = resume_store.get_resume_store()
+        key = self.crawl_key()
+        seen = await asyncio.to_thread(store.crawl_seen, key) if store is not None else {}
+
+        new_documents = []
+        page_size = None
+        for page in range(1, num_pages + 1):
+            print(f"Crawling page {page}...")
+            documents, total = await self.afetch_documents(page)
+            if self.collect_unseen(documents, seen, new_documents):
+                break
+            page_size = page_size or len(documents)
+            if page >= self.get_last_page(total, page_size, num_pages):
+                break
+        return await asyncio.to_thread(self.finish_crawl, store, key, new_documents)
+
+    def collect_unseen(self, documents, seen, new_documents):
+        # Returns True once paging should stop: an empty page or an already-known resume
+        if not documents:
+            return True
+        for doc in documents:
+            if seen.get(str(doc.get('resumeId'))) == doc.get('updateDate'):
+                print(f"Resume {doc.get('resumeId')} is unchanged since the last crawl, stopping.")
+                return True
+            new_documents.append(doc)
+        return False
+
+    def finish_crawl(self, store, key, documents):
+        resumes = self.parse_documents(documents)
+        if store is not None:
+            store.add_many(self.SITE_NAME, resumes)
+            store.mark_crawled(key, [(doc.get('resumeId'), doc.get('updateDate')) for doc in documents])
+        return resumes
+
+    def iter_resumes(self, num_pages=10):
+        # Page 1 tells us the page size and total, the remaining pages are fetched in parallel
+        # with at most max_workers in flight, and yielded in page order as they arrive
+        self.failed = []
+        print("Fetching page 1...")
+        first_page, total = self.fetch_page(1)
+        if not first_page:
+            return
+
+        pages = iter(range(2, self.get_last_page(total, len(first_page), num_pages) + 1))
+        pending = deque()
+
+        def fetch_one(page):
+            print(f"Fetching page {page}...")
+            return self.fetch_resumes(page)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit_next():
+                page = next(pages, None)
+                if page is not None:
+                    pending.append((page, executor.submit(fetch_one, page)))
+
+            for _ in range(self.max_workers):
+                submit_next()
+            try:
+                yield from first_page
+                while pending:
+                    page, future = pending.popleft()
+                    page_resumes = future.result()
+                    if not page_resumes:
+                        print(f"No resumes found on page {page}, stopping further fetches.")
+                        break
+                    submit_next()
+                    yield from page_resumes
+            finally:
+                for _, future in pending:
+                    future.cancel()  # Drop pages that haven't started yet
+
+    async def aiter_resumes(self, num_pages=10):
+        self.failed = []
+        print("Fetching page 1...")
+        first_page, total = await self.afetch_page(1)
+        if not first_page:
+            return
+
+        pages = iter(range(2, self.get_last_page(total, len(first_page), num_pages) + 1))
+        pending = deque()
+
+        async def fetch_one(page):
             print(f"Fetching page {page}...")
-            page_resumes = self.fetch_resumes(page)
-            if page_resumes:
-                all_resumes.extend(page_resumes)
+            return await self.afetch_resumes(page)
 
-        return all_resumes
+        def submit_next():
+            page = next(pages, None)
+            if page is not None:
+                pending.append((page, asyncio.create_task(fetch_one(page))))
+
+        for _ in range(self.max_workers):
+            submit_next()
+        try:
+            for resume in first_page:
+                yield resume
+            while pending:
+                page, task = pending.popleft()
+                page_resumes = await task
+                if not page_resumes:
+                    print(f"No resumes found on page {page}, stopping further fetches.")
+                    break
+                submit_next()
+                for resume in page_resumes:
+                    yield resume
+        finally:
+            for _, task in pending:
+                task.cancel()
 
 # Parser testing
 # job_position = "3д дизайнер"
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight coroutine instead of each running it."""
+
+    def __init__(self):
+        self._calls = {}  # key -> task
+
+    def join(self, key):
+        # The task already running for key, or None
+        return self._calls.get(key)
+
+    async def run(self, key, func, *args):
+        result, _ = await self.run_or_follow(key, func, *args)
+        return result
+
+    async def run_or_follow(self, key, func, *args):
+        """(result, True) when this call ran func(*args), (result, False) when it waited for another call's run.
+
+        Followers get whatever the leader's func returned, which may have been built for the leader
+        (e.g. sent to another chat), so callers that act on the result need to know which they were.
+        """
+        task = self._calls.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(func(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shielded, so one caller giving up doesn't cancel the work for the others
+        return await asyncio.shield(task), leader
+
+
+class ThreadSingleFlight:
+    """SingleFlight for code running in threads: one caller does the work, the others wait for it."""
+
+    def __init__(self):
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def run(self, key, func, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+
+from parsers.dedup import DuplicateFilter
+
+
+class Capabilities:
+    """What a resume site supports beyond the basic search.
+
+    filters: the search filters the site applies itself (the others are ignored);
+    incremental: crawl() returns only new resumes instead of everything;
+    search_timeout: default seconds the site gets when searched together with others.
+    """
+
+    def __init__(self, filters=(), incremental=False, search_timeout=60):
+        self.filters = frozenset(filters)
+        self.incremental = incremental
+        self.search_timeout = search_timeout
+
+
+class ResumeSource(ABC):
+    """Interface every resume site parser implements.
+
+    Parsers are constructed with the same arguments, with None meaning "not specified":
+    job_position and keywords as text, location as a city name, salary as the expected monthly
+    salary in UAH (int), experience as minimum years (int) and english_language as a truthy flag.
+    Each parser fills in its site's own defaults for the arguments left as None (e.g. Robota.ua
+    requires English unless told otherwise).
+    Subclasses provide iter_resumes and aiter_resumes, which yield Resume records in result order.
+    A request that fails for good is skipped rather than raised, and leaves failed set to
+    [SITE_NAME] until the next search, so callers can tell a short result from a complete one.
+    """
+
+    SITE_NAME = None
+    CAPABILITIES = Capabilities()
+    failed = ()
+
+    def mark_failed(self):
+        self.failed = [self.SITE_NAME]
+
+    @abstractmethod
+    def iter_resumes(self, num_pages=10):
+        """Resumes of up to num_pages result pages, in result order."""
+
+    @abstractmethod
+    def aiter_resumes(self, num_pages=10):
+        """Async generator version of iter_resumes."""
+
+    def fetch_multiple_pages(self, num_pages=10):
+        # Results shift between page requests, so a resume can turn up on two pages
+        duplicates = DuplicateFilter()
+        return [resume for resume in self.iter_resumes(num_pages) if not duplicates.is_duplicate(resume)]
+
+    async def afetch_multiple_pages(self, num_pages=10):
+        duplicates = DuplicateFilter()
+        return [resume async for resume in self.aiter_resumes(num_pages) if not duplicates.is_duplicate(resume)]
+
+    def crawl(self, num_pages=10):
+        # Sites without incremental support just return everything
+        return self.fetch_multiple_pages(num_pages)
+
+    async def acrawl(self, num_pages=10):
+        return await self.afetch_multiple_pages(num_pages)
@@ -0,0 +1,252 @@
+import re
+from html import unescape
+
+from parsers.resume import NOT_SPECIFIED, ExperienceEntry, Resume
+
+# Class attributes the Work.ua resume page uses for the fields we extract
+POSITION_CLASS = "mt-lg sm:mt-xl"
+EXPERIENCE_CLASS = "h4 strong-600 mt-lg sm:mt-xl"
+SKILL_CLASS = "no-style mr-sm mt-sm"
+ADDITIONAL_INFO_CLASS = "text-default-7 mb-0"
+CONTACTS_TITLE = "Контактна інформація"
+LOCATION_LABEL = "Місто проживання"
+
+# One token per match: comments, declarations and <script>/<style> blocks are skipped whole,
+# everything else is a start or end tag. Text is whatever lies between two tokens.
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(?:script|style)\b[^>]*>.*?</(?:script|style)\s*>'
+    r'|<[!?][^>]*>'
+    r'|<(/?)([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.S | re.I,
+)
+ATTRIBUTE_RE = re.compile(r'(?:^|\s)(class|id)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))', re.I)
+TRACKED_TAGS = {"h2", "p", "span", "li", "dt", "dd"}
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class _Capture:
+    __slots__ = ("parts", "callback")
+
+    def __init__(self, callback):
+        self.parts = []
+        self.callback = callback
+
+
+class WorkUaResumeExtractor:
+    """Collects every field of a Work.ua resume page in one pass, without building a tree.
+
+    Produces the same values as WorkUaParser.parse_resume does on a BeautifulSoup tree.
+    """
+
+    def __init__(self):
+        self.stack = []  # [tag, captures owned by the element or None]
+        self.active = []  # Captures currently receiving text
+
+        self.position = None
+        self.salary = None
+        self.add_info = None
+        self.location = None
+        self.location_parent_depth = None  # Set once the "Місто проживання" <dt> is seen
+        self.skills = []
+        self.current_skill = None
+        self.experiences = []
+        self.current_title = None  # (depth, experience) while its <h2> is open, for the duration <span>
+        self.awaiting_company = []
+        self.awaiting_additional_info = []
+
+    def feed(self, html):
+        position = 0
+        for match in TOKEN_RE.finditer(html):
+            if self.active and match.start() > position:
+                self.handle_data(unescape(html[position:match.start()]))
+            position = match.end()
+
+            tag = match.group(2)
+            if tag is None:
+                continue  # Comment, declaration, script or style
+            tag = tag.lower()
+            if match.group(1):
+                self.handle_endtag(tag)
+                continue
+
+            attributes = match.group(3)
+            self.handle_starttag(tag, attributes)
+            if attributes.endswith("/"):
+                self.handle_endtag(tag)
+
+        if self.active and position < len(html):
+            self.handle_data(unescape(html[position:]))
+
+    def handle_starttag(self, tag, attribute_text):
+        if tag in VOID_ELEMENTS:
+            return
+
+        # Attributes are only parsed for the tags we look at, or when an id might be present
+        attributes = {}
+        if tag in TRACKED_TAGS or "id" in attribute_text:
+            for name, double_quoted, single_quoted, unquoted in ATTRIBUTE_RE.findall(attribute_text):
+                value = double_quoted or single_quoted or unquoted
+                attributes[name.lower()] = unescape(value) if "&" in value else value
+
+        captures = None
+        classes = (attributes.get("class") or "").split()
+
+        if tag == "h2":
+            class_name = " ".join(classes)
+            if class_name == POSITION_CLASS and self.position is None:
+                self.position = ""
+                captures = [self._capture(self._set_position)]
+            elif class_name == EXPERIENCE_CLASS:
+                experience = {"title": "", "name": NOT_SPECIFIED, "additional_info": NOT_SPECIFIED, "duration": None}
+                self.experiences.append(experience)
+                self.awaiting_company.append(experience)
+                self.current_title = (len(self.stack), experience)
+                captures = [self._capture(lambda text: experience.__setitem__("title", text.strip()))]
+        elif tag == "p":
+            # The additional info <p> is searched for after the company <p>, never the same element
+            if self.awaiting_additional_info and " ".join(classes) == ADDITIONAL_INFO_CLASS:
+                captures = [self._capture(self._additional_info_setter(self.awaiting_additional_info))]
+                self.awaiting_additional_info = []
+            if self.awaiting_company and "mb-0" in classes:
+                waiting = self.awaiting_company
+                captures = (captures or []) + [self._capture(lambda text: self._set_company(waiting, text))]
+                self.awaiting_additional_info.extend(waiting)
+                self.awaiting_company = []
+        elif tag == "span":
+            captures = []
+            if self.current_title is not None and self.current_title[1]["duration"] is None and "text-default-7" in classes:
+                experience = self.current_title[1]
+                experience["duration"] = ""
+                captures.append(self._capture(lambda text: experience.__setitem__("duration", text.strip())))
+            if self.salary is None and "text-muted-print" in classes:
+                self.salary = ""
+                captures.append(self._capture(self._set_salary))
+            if self.current_skill is not None and self.current_skill[1] is None and "ellipsis" in classes:
+                skill = self.current_skill
+                skill[1] = ""
+                captures.append(self._capture(lambda text: skill.__setitem__(1, text.strip())))
+        elif tag == "li":
+            if " ".join(classes) == SKILL_CLASS:
+                self.current_skill = [len(self.stack), None]
+                self.skills.append(self.current_skill)
+        elif tag == "dt":
+            if self.location is None and self.location_parent_depth is None:
+                depth = len(self.stack)
+                captures = [self._capture(lambda text: self._check_location_label(text, depth))]
+        elif tag == "dd":
+            if self.location is None and self.location_parent_depth == len(self.stack):
+                self.location = ""
+                captures = [self._capture(self._set_location)]
+
+        if attributes.get("id") == "addInfo" and self.add_info is None:
+            self.add_info = ""
+            captures = (captures or []) + [self._capture(self._set_add_info)]
+
+        self.stack.append([tag, captures])
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                while len(self.stack) > index:
+                    self._pop()
+                return
+        # End tags without a matching start tag are ignored, as BeautifulSoup does
+
+    def handle_data(self, data):
+        for capture in self.active:
+            capture.parts.append(data)
+
+    def close(self):
+        while self.stack:
+            self._pop()
+
+    def _pop(self):
+        tag, captures = self.stack.pop()
+        depth = len(self.stack)
+
+        if captures:
+            for capture in captures:
+                self.active.remove(capture)
+                capture.callback("".join(capture.parts))
+
+        if tag == "h2" and self.current_title is not None and self.current_title[0] == depth:
+            self.current_title = None
+        if tag == "li" and self.current_skill is not None and self.current_skill[0] == depth:
+            self.current_skill = None
+        if self.location_parent_depth is not None and self.location is None and depth < self.location_parent_depth:
+            # The <dt>'s parent closed without a <dd> sibling
+            self.location = NOT_SPECIFIED
+
+    def _capture(self, callback):
+        capture = _Capture(callback)
+        self.active.append(capture)
+        return capture
+
+    def _set_position(self, text):
+        self.position = text.strip()
+
+    def _set_salary(self, text):
+        self.salary = text.strip().replace("&nbsp;", " ").replace(',', '').strip()
+
+    def _set_location(self, text):
+        self.location = text.strip()
+
+    def _set_add_info(self, text):
+        self.add_info = text.strip()
+
+    def _set_company(self, experiences, text):
+        name = text.strip()
+        if '\n' in name:
+            name = name.split('\n')[-1].strip()
+        for experience in experiences:
+            experience["name"] = name
+
+    def _additional_info_setter(self, experiences):
+        def set_additional_info(text):
+            for experience in experiences:
+                experience["additional_info"] = text.strip()
+        return set_additional_info
+
+    def _check_location_label(self, text, depth):
+        if LOCATION_LABEL in text.strip():
+            self.location_parent_depth = depth
+
+    def result(self, link):
+        experiences = []
+        for experience in self.experiences:
+            if experience["title"] == CONTACTS_TITLE:
+                continue
+            duration = experience["duration"]
+            if duration is None:
+                duration = NOT_SPECIFIED
+            elif '(' in duration and ')' in duration:
+                duration = duration.replace('(', '').replace(')', '').strip()
+            experiences.append(ExperienceEntry(
+                title=experience["title"],
+                name=experience["name"],
+                duration=duration,
+                additional_info=experience["additional_info"],
+            ))
+
+        return Resume(
+            position=self.position if self.position is not None else NOT_SPECIFIED,
+            location=self.location if self.location is not None else NOT_SPECIFIED,
+            salary_expectation=self.salary if self.salary is not None else NOT_SPECIFIED,
+            skills=[NOT_SPECIFIED if name is None else name for _, name in self.skills],
+            experience=experiences,
+            add_info=self.add_info if self.add_info is not None else NOT_SPECIFIED,
+            link=link,
+            site="Work.ua",
+        )
+
+
+def extract_resume(html, link):
+    extractor = WorkUaResumeExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.result(link)
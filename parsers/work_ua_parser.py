@@ -1,57 +1,267 @@
-import requests
-from bs4 import BeautifulSoup
-
-class WorkUaParser:
+import asyncio
+import queue
+import threading
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from concurrent.futures import ThreadPoolExecutor
+from parsers import http_client, resume_cache, resume_store, workers
+from parsers.resume import ExperienceEntry, Resume
+from parsers.singleflight import SingleFlight, ThreadSingleFlight
+from parsers.source import Capabilities, ResumeSource
+from parsers.work_ua_extractor import extract_resume
+
+# Shared by all parser instances, so concurrent searches fetch a resume page only once
+resume_flights = SingleFlight()
+thread_resume_flights = ThreadSingleFlight()
+
+class WorkUaParser(ResumeSource):
+    SITE_NAME = "Work.ua"
+    CAPABILITIES = Capabilities(
+        filters=("job_position", "location", "salary", "experience", "english_language", "keywords"),
+        incremental=True,
+        search_timeout=60,
+    )
     BASE_URL = "https://www.work.ua/resumes"
+    MAX_WORKERS = 8  # Resume pages fetched in parallel per search page
+    QUEUE_SIZE = 20  # Resume links waiting for a worker in iter_resumes
+    RESUME_CARD_CLASS = 'card card-hover card-search resume-link card-visited wordwrap'
 
-    def __init__(self, job_position, location="", salary=None, experience=None, english_language=None, keywords=None):
-        self.job_position = job_position
-        self.location = location if location != "-" else ""
+    def __init__(self, job_position, location=None, salary=None, experience=None, english_language=None, keywords=None, max_workers=MAX_WORKERS):
+        self.job_position = job_position if job_position and job_position != "-" else None
+        self.location = location if location and location != "-" else ""
         self.salary = salary if salary != "-" else None
         self.experience = experience if experience != "-" else None
         self.english_language = english_language if english_language != "-" else None
         self.keywords = keywords if keywords != "-" else None
+        self.max_workers = max_workers if max_workers and max_workers > 0 else 1
         self.resumes = []
 
-    def fetch_multiple_pages(self, num_pages=10):
-        all_resumes = []
-        for page in range(1, num_pages + 1):
-            print(f"Fetching page {page}...")
-            page_resumes = self.fetch_resumes(page)
-            if page_resumes:
-                all_resumes.extend(page_resumes)
-            else:
-                print(f"No resumes found on page {page}, stopping further fetches.")
-                break  # Stop fetching if no resumes are found
-        return all_resumes
+    def crawl_key(self):
+        # The search URL without its page number
+        return f"{self.SITE_NAME} {self.build_search_url(1).rsplit('?page=', 1)[0]}"
+
+    def crawl(self, num_pages=10):
+        """Incremental fetch: only resumes whose links this search hasn't returned before.
+
+        Search pages are still walked in full (they aren't sorted by date, so there is no point
+        where the rest is known to be old), but resume pages are fetched only for unseen links.
+        """
+        store = resume_store.get_resume_store()
+        key = self.crawl_key()
+        seen = store.crawl_seen(key) if store is not None else {}
+        resumes = list(self.iter_resumes(num_pages, skip_links=seen))
+        if store is not None:
+            store.mark_crawled(key, [(resume.link, None) for resume in resumes])
+        return resumes
+
+    async def acrawl(self, num_pages=10):
+        store = resume_store.get_resume_store()
+        key = self.crawl_key()
+        seen = await asyncio.to_thread(store.crawl_seen, key) if store is not None else {}
+        resumes = [resume async for resume in self.aiter_resumes(num_pages, skip_links=seen)]
+        if store is not None:
+            await asyncio.to_thread(store.mark_crawled, key, [(resume.link, None) for resume in resumes])
+        return resumes
+
+    def iter_resumes(self, num_pages=10, skip_links=()):
+        # A producer walks the search pages and queues resume links for a pool of workers,
+        # so the next search page is requested while the current one's resumes are fetched.
+        # Resumes are yielded in search order as soon as they (and everything before them) are parsed.
+        self.failed = []
+        links = queue.Queue()
+        results = queue.Queue()
+        window = threading.Semaphore(self.QUEUE_SIZE + self.max_workers)  # Links handed out but not yet yielded
+        stop = threading.Event()
+
+        def producer():
+            count = 0
+            try:
+                for page in range(1, num_pages + 1):
+                    print(f"Fetching page {page}...")
+                    page_links = self.fetch_resume_links(page)
+                    if not page_links:
+                        print(f"No resumes found on page {page}, stopping further fetches.")
+                        break  # Stop fetching if no resumes are found
+                    for url in page_links:
+                        if url in skip_links:
+                            continue
+                        while not window.acquire(timeout=0.1):  # Waits while the consumer is behind
+                            if stop.is_set():
+                                return
+                        links.put((count, url))
+                        count += 1
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                print(f"Failed to fetch search results: {e}")
+                self.mark_failed()
+            finally:
+                results.put((None, count))
+                for _ in workers:
+                    links.put(None)
+
+        def worker():
+            while True:
+                item = links.get()
+                if item is None:
+                    return
+                index, url = item
+                parsed_resume = None
+                if not stop.is_set():
+                    try:
+                        parsed_resume = self.fetch_and_parse_resume(url)
+                    except Exception as e:
+                        print(f"Failed to fetch resume {url}: {e}")
+                        self.mark_failed()
+                results.put((index, parsed_resume))
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.max_workers)]
+        for thread in [threading.Thread(target=producer, daemon=True)] + workers:
+            thread.start()
+
+        try:
+            # Workers finish out of order; hold results back until every earlier one has arrived
+            buffered = {}
+            next_index, count = 0, None
+            while count is None or next_index < count:
+                index, parsed_resume = results.get()
+                if index is None:
+                    count = parsed_resume
+                    continue
+                buffered[index] = parsed_resume
+                while next_index in buffered:
+                    parsed_resume = buffered.pop(next_index)
+                    next_index += 1
+                    window.release()
+                    if parsed_resume:
+                        yield parsed_resume
+        finally:
+            stop.set()  # Lets the threads wind down when the caller stops early
+
+    async def aiter_resumes(self, num_pages=10, skip_links=()):
+        self.failed = []
+        links = asyncio.Queue()
+        results = asyncio.Queue()
+        window = asyncio.Semaphore(self.QUEUE_SIZE + self.max_workers)
+
+        async def producer():
+            count = 0
+            try:
+                for page in range(1, num_pages + 1):
+                    print(f"Fetching page {page}...")
+                    page_links = await self.afetch_resume_links(page)
+                    if not page_links:
+                        print(f"No resumes found on page {page}, stopping further fetches.")
+                        break  # Stop fetching if no resumes are found
+                    for url in page_links:
+                        if url in skip_links:
+                            continue
+                        await window.acquire()
+                        links.put_nowait((count, url))
+                        count += 1
+            except Exception as e:
+                print(f"Failed to fetch search results: {e}")
+                self.mark_failed()
+            finally:
+                results.put_nowait((None, count))
+
+        async def worker():
+            while True:
+                index, url = await links.get()
+                parsed_resume = None
+                try:
+                    parsed_resume = await self.afetch_and_parse_resume(url)
+                except Exception as e:
+                    print(f"Failed to fetch resume {url}: {e}")
+                    self.mark_failed()
+                results.put_nowait((index, parsed_resume))
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.max_workers)]
+        try:
+            buffered = {}
+            next_index, count = 0, None
+            while count is None or next_index < count:
+                index, parsed_resume = await results.get()
+                if index is None:
+                    count = parsed_resume
+                    continue
+                buffered[index] = parsed_resume
+                while next_index in buffered:
+                    parsed_resume = buffered.pop(next_index)
+                    next_index += 1
+                    window.release()
+                    if parsed_resume:
+                        yield parsed_resume
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def fetch_resumes(self, page=1):
+        links = self.fetch_resume_links(page)
+        return [resume for resume in self.fetch_and_parse_resumes(links) if resume]
+
+    async def afetch_resumes(self, page=1):
+        links = await self.afetch_resume_links(page)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch_one(url):
+            async with semaphore:
+                return await self.afetch_and_parse_resume(url)
+
+        # gather keeps the results in the same order as the search cards
+        parsed_resumes = await asyncio.gather(*(fetch_one(url) for url in links))
+        return [resume for resume in parsed_resumes if resume]
+
+    def fetch_resume_links(self, page=1):
+        search_url = self.build_search_url(page)
+        print(f"Fetching URL: {search_url}")
+        page_to_scrape = http_client.get(search_url)
+
+        if page_to_scrape.status_code != 200:
+            print(f"Failed to retrieve data from work.ua: {search_url}")
+            self.mark_failed()
+            return []
+
+        return self.extract_resume_links(page_to_scrape.text, page)
+
+    async def afetch_resume_links(self, page=1):
         search_url = self.build_search_url(page)
         print(f"Fetching URL: {search_url}")
-        page_to_scrape = requests.get(search_url)
+        page_to_scrape = await http_client.aget(search_url)
 
         if page_to_scrape.status_code != 200:
             print(f"Failed to retrieve data from work.ua: {search_url}")
+            self.mark_failed()
             return []
 
-        soup = BeautifulSoup(page_to_scrape.text, "html.parser")
-        resumes = soup.find_all('div', class_='card card-hover card-search resume-link card-visited wordwrap')
+        return await workers.run_parser(self.extract_resume_links, page_to_scrape.text, page)
+
+    def extract_resume_links(self, html, page=1):
+        # Only the resume cards are turned into a tree, the rest of the page is skipped
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer('div', class_=self.RESUME_CARD_CLASS))
+        resumes = soup.find_all('div', class_=self.RESUME_CARD_CLASS)
 
         if not resumes:
             print(f"No resumes found on page {page}.")
             return []
 
-        resume_data = []
+        links = []
         for resume in resumes:
             link_tag = resume.find('a', href=True)
             if link_tag:
                 full_url = f"https://www.work.ua{link_tag['href']}"
                 print(f"Fetching resume: {full_url}")
-                parsed_resume = self.fetch_and_parse_resume(full_url)
-                if parsed_resume:
-                    resume_data.append(parsed_resume)
+                links.append(full_url)
+        return links
+
+    def fetch_and_parse_resumes(self, urls):
+        # executor.map keeps the results in the same order as the search cards
+        workers = min(self.max_workers, len(urls))
+        if workers <= 1:
+            return [self.fetch_and_parse_resume(url) for url in urls]
 
-        return resume_data
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.fetch_and_parse_resume, urls))
 
     def build_search_url(self, page=1):
         search_url = self.BASE_URL
@@ -59,12 +269,13 @@ class WorkUaParser:
 
         if self.location:
             search_url += f"-{self.location.replace(' ', '+').lower()}"
-        search_url += f"-{self.job_position.replace(' ', '+').lower()}"
+        if self.job_position:
+            search_url += f"-{self.job_position.replace(' ', '+').lower()}"
 
         if self.keywords:
             query_params.append("notitle=1")
             keyword_string = "+".join(self.keywords.split())
-            search_url += f"+{keyword_string}"
+            search_url += f"+{keyword_string}" if self.job_position else f"-{keyword_string}"
 
         if self.salary:
             salary_code = self.get_salary_code(int(self.salary))
@@ -88,13 +299,52 @@ class WorkUaParser:
         return search_url
 
     def fetch_and_parse_resume(self, url):
-        resume_page = requests.get(url)
+        return thread_resume_flights.run(url, self._fetch_and_parse_resume, url)
+
+    async def afetch_and_parse_resume(self, url):
+        return await resume_flights.run(url, self._afetch_and_parse_resume, url)
+
+    def _fetch_and_parse_resume(self, url):
+        resume_page = http_client.get(url)
         if resume_page.status_code != 200:
             print(f"Failed to retrieve resume page: {url}")
             return None
 
-        resume_soup = BeautifulSoup(resume_page.text, "html.parser")
-        return self.parse_resume(resume_soup, url)
+        # An unchanged page is parsed only once
+        cache = resume_cache.get_resume_cache()
+        digest = resume_cache.content_hash(resume_page.text)
+        parsed_resume = cache.get(url, digest)
+        if parsed_resume is None:
+            parsed_resume = self.parse_resume_html(resume_page.text, url)
+            cache.put(url, digest, parsed_resume)
+
+        store = resume_store.get_resume_store()
+        if store is not None:
+            store.add(self.SITE_NAME, parsed_resume)
+        return parsed_resume
+
+    async def _afetch_and_parse_resume(self, url):
+        resume_page = await http_client.aget(url)
+        if resume_page.status_code != 200:
+            print(f"Failed to retrieve resume page: {url}")
+            return None
+
+        cache = resume_cache.get_resume_cache()
+        digest = resume_cache.content_hash(resume_page.text)
+        parsed_resume = await asyncio.to_thread(cache.get, url, digest)
+        if parsed_resume is None:
+            # Parsing is CPU-bound, keep it off the event loop
+            parsed_resume = await workers.run_parser(self.parse_resume_html, resume_page.text, url)
+            await asyncio.to_thread(cache.put, url, digest, parsed_resume)
+
+        store = resume_store.get_resume_store()
+        if store is not None:
+            await asyncio.to_thread(store.add, self.SITE_NAME, parsed_resume)
+        return parsed_resume
+
+    def parse_resume_html(self, html, url):
+        # Single-pass extractor; parse_resume below does the same on a BeautifulSoup tree
+        return extract_resume(html, url)
 
     def parse_resume(self, resume, link):
         position = self.get_text(resume, 'h2', 'mt-lg sm:mt-xl', "Not specified")
@@ -105,15 +355,16 @@ class WorkUaParser:
         location = self.get_location(resume)
         add_info = self.get_text(resume, id="addInfo", default="Not specified")
 
-        return {
-            "position": position,
-            "jobs_and_education": experiences,
-            "skills": skills,
-            "location": location,
-            "salary_expectation": salary_expectation,
-            "add_info": add_info,
-            "link": link
-        }
+        return Resume(
+            position=position,
+            location=location,
+            salary_expectation=salary_expectation,
+            skills=skills,
+            experience=experiences,
+            add_info=add_info,
+            link=link,
+            site=self.SITE_NAME,
+        )
 
     def get_salary_expectation(self, resume):
         salary_tag = resume.find('span', class_='text-muted-print')
@@ -121,34 +372,52 @@ class WorkUaParser:
         return salary_text.replace(',', '').strip()
 
     def parse_experiences(self, resume):
-        experiences = []
-        job_edu_titles = resume.find_all('h2', class_='h4 strong-600 mt-lg sm:mt-xl')
+        # One ordered walk over the document: each title takes the first <p class="mb-0"> after it
+        # as its company, and each company the first <p class="text-default-7 mb-0"> after it.
+        # Calling find_next per title instead re-scans the rest of the page for every entry.
+        entries = []
+        awaiting_company = []
+        awaiting_additional_info = []
+
+        for element in resume.descendants:
+            if not isinstance(element, Tag):
+                continue
+
+            if element.name == 'h2' and " ".join(element.get('class', [])) == 'h4 strong-600 mt-lg sm:mt-xl':
+                entry = [element, None, None]
+                entries.append(entry)
+                awaiting_company.append(entry)
+            elif element.name == 'p':
+                classes = element.get('class', [])
+                if awaiting_additional_info and " ".join(classes) == 'text-default-7 mb-0':
+                    for entry in awaiting_additional_info:
+                        entry[2] = element
+                    awaiting_additional_info = []
+                if awaiting_company and 'mb-0' in classes:
+                    for entry in awaiting_company:
+                        entry[1] = element
+                    awaiting_additional_info.extend(awaiting_company)
+                    awaiting_company = []
 
-        for job_edu_title_element in job_edu_titles:
+        experiences = []
+        for job_edu_title_element, company_element, additional_info_element in entries:
             if job_edu_title_element.text.strip() != "Контактна інформація":
-                experiences.append(self.extract_experience_details(job_edu_title_element))
+                experiences.append(self.extract_experience_details(job_edu_title_element, company_element, additional_info_element))
 
         return experiences
 
-    def extract_experience_details(self, job_edu_title_element):
+    def extract_experience_details(self, job_edu_title_element, company_element, additional_info_element):
         title = job_edu_title_element.text.strip() if job_edu_title_element else "Not specified"
 
-        company_element = job_edu_title_element.find_next('p', class_='mb-0')
         name_with_duration = company_element.text.strip() if company_element else "Not specified"
         name = self.extract_company_name(name_with_duration)
 
-        additional_info_element = company_element.find_next('p', class_='text-default-7 mb-0')
         additional_info = additional_info_element.text.strip() if additional_info_element else "Not specified"
 
         duration = self.get_text(job_edu_title_element, 'span', 'text-default-7', "Not specified")
         duration = self.clean_duration(duration)
 
-        return {
-            "title": title,
-            "name": name,
-            "additional_info": additional_info,
-            "duration": duration
-        }
+        return ExperienceEntry(title=title, name=name, duration=duration, additional_info=additional_info)
 
     def extract_company_name(self, name_with_duration):
         if '\n' in name_with_duration:
@@ -183,6 +452,8 @@ class WorkUaParser:
             element = soup.find(tag, class_=class_name)
         elif tag and id:
             element = soup.find(tag, id=id)
+        elif id:
+            element = soup.find(id=id)
         elif tag:
             element = soup.find(tag)
         else:
@@ -218,17 +489,6 @@ class WorkUaParser:
         else:
             return 166
 
-    def __str__(self):
-        resume_str = f"Position: {self.position}\n"
-        resume_str += f"Salary Expectation: {self.salary_expectation}\n"
-        resume_str += f"Location: {self.location}\n"
-        resume_str += f"Additional Info: {self.add_info}\n"
-        resume_str += f"Skills: {', '.join(self.skills)}\n"
-        resume_str += f"Experience:\n"
-        for exp in self.jobs_and_education:
-            resume_str += f"\t{exp['title']} at {exp['name']} ({exp['duration']})\n"
-        return resume_str
-
 # Parser testing
 # parser = WorkUaParser(job_position="designer", location="Kyiv", experience=3, english_language="yes")
 # resumes = parser.fetch_multiple_pages(num_pages=6)
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Pool sizes: WORKER_THREADS for blocking I/O, PARSE_PROCESSES for HTML parsing (0 parses in the thread pool)
+_thread_pool = None
+_process_pool = None
+_lock = threading.Lock()
+
+
+def get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        with _lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("WORKER_THREADS", 16)),
+                    thread_name_prefix="worker",
+                )
+    return _thread_pool
+
+
+def get_process_pool():
+    global _process_pool
+    processes = int(os.getenv("PARSE_PROCESSES", os.cpu_count() or 1))
+    if processes <= 0:
+        return None
+    if _process_pool is None:
+        with _lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=processes)
+    return _process_pool
+
+
+async def run_parser(func, *args):
+    """Run CPU-heavy parsing in the process pool; func and its arguments must be picklable."""
+    pool = get_process_pool() or get_thread_pool()
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
+def shutdown():
+    global _thread_pool, _process_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=False, cancel_futures=True)
+            _thread_pool = None
@@ -0,0 +1,71 @@
+import asyncio
+from collections import deque
+from contextlib import aclosing
+
+
+class FederatedSearch:
+    """Runs the same search on several sites at once and merges the resumes into one stream.
+
+    sources maps a site name to its parser. Each site has its own timeout, after which whatever it
+    found so far is kept and the rest is dropped, so a slow site never holds back the others.
+    """
+
+    def __init__(self, sources, timeouts=None, default_timeout=60):
+        self.sources = sources
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.failed = []  # Sites that timed out, failed or lost results to failed requests in the last search
+
+    async def aiter_resumes(self, num_pages=1):
+        arrived = asyncio.Queue()
+        self.failed = []
+
+        async def search(site, parser):
+            async def consume():
+                async with aclosing(parser.aiter_resumes(num_pages)) as stream:
+                    async for resume in stream:
+                        arrived.put_nowait((site, resume))
+
+            try:
+                await asyncio.wait_for(consume(), self.timeouts.get(site, self.default_timeout))
+                if getattr(parser, "failed", None):  # Requests the parser skipped, see ResumeSource
+                    self.failed.append(site)
+            except asyncio.TimeoutError:
+                print(f"Search on {site} timed out, keeping the resumes found so far.")
+                self.failed.append(site)
+            except Exception as e:
+                print(f"Search on {site} failed: {e}")
+                self.failed.append(site)
+            finally:
+                arrived.put_nowait((site, None))  # This site is done
+
+        buffers = {site: deque() for site in self.sources}
+        yielded = dict.fromkeys(self.sources, 0)
+        running = len(self.sources)
+
+        def take(item):
+            nonlocal running
+            site, resume = item
+            if resume is None:
+                running -= 1
+            else:
+                buffers[site].append(resume)
+
+        tasks = [asyncio.create_task(search(site, parser)) for site, parser in self.sources.items()]
+        try:
+            while running or any(buffers.values()):
+                if not any(buffers.values()):
+                    take(await arrived.get())
+                while not arrived.empty():
+                    take(arrived.get_nowait())
+
+                # Interleave: of the sites with something ready, the one shown least so far goes next
+                ready = [site for site in buffers if buffers[site]]
+                if not ready:
+                    continue
+                site = min(ready, key=yielded.get)
+                yielded[site] += 1
+                yield buffers[site].popleft()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,59 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from search.query import QUERY_FIELDS, query_key
+
+DEFAULT_PATH = os.path.join(".cache", "search_history.sqlite3")
+
+
+class SearchHistory:
+    """How often each normalized search is run; older searches count for less (halved every half_life)."""
+
+    def __init__(self, path=DEFAULT_PATH, half_life=7 * 24 * 3600, max_entries=5000):
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            " key TEXT PRIMARY KEY, user_data TEXT, score REAL, last_searched REAL)"
+        )
+        self._db.commit()
+
+    def _decayed(self, score, last_searched, now):
+        return score * 0.5 ** ((now - last_searched) / self.half_life)
+
+    def record(self, user_data):
+        # The latest filters as the user typed them, so they can be replayed through build_parser
+        key = query_key(user_data)
+        filters = json.dumps({field: user_data.get(field) for field in QUERY_FIELDS}, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT score, last_searched FROM searches WHERE key = ?", (key,)).fetchone()
+            score = 1.0 + (self._decayed(*row, now) if row else 0.0)
+            self._db.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)", (key, filters, score, now))
+            count = self._db.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM searches WHERE key IN (SELECT key FROM searches ORDER BY last_searched LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+
+    def popular(self, limit=20):
+        """Filters of the most popular searches, most popular first."""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute("SELECT user_data, score, last_searched FROM searches").fetchall()
+        rows.sort(key=lambda row: self._decayed(row[1], row[2], now), reverse=True)
+        return [json.loads(row[0]) for row in rows[:limit]]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
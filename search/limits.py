@@ -0,0 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class SearchLimitExceeded(Exception):
+    pass
+
+
+class SearchLimiter:
+    """Caps in-flight searches per user and across the whole bot."""
+
+    def __init__(self, max_searches=20, max_per_user=1):
+        self.max_searches = max_searches
+        self.max_per_user = max_per_user
+        self.running = {}  # user_id -> number of searches in flight
+        self._slots = asyncio.Semaphore(max_searches)
+
+    def is_busy(self):
+        # True when a new search would have to wait for a global slot
+        return self._slots.locked()
+
+    @asynccontextmanager
+    async def slot(self, user_id):
+        # Users over their cap are rejected right away, the global cap queues searches instead
+        if self.running.get(user_id, 0) >= self.max_per_user:
+            raise SearchLimitExceeded(
+                f"You already have {self.running[user_id]} search(es) running. Please wait for them to finish."
+            )
+
+        self.running[user_id] = self.running.get(user_id, 0) + 1
+        try:
+            async with self._slots:
+                yield
+        finally:
+            self.running[user_id] -= 1
+            if not self.running[user_id]:
+                del self.running[user_id]
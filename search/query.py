@@ -0,0 +1,27 @@
+import json
+
+# Search filters collected by the /search conversation in main.py
+QUERY_FIELDS = ("job_position", "location", "salary", "years_of_experience", "english_language", "keywords", "site")
+NUMERIC_FIELDS = ("salary", "years_of_experience")
+
+
+def normalize_query(user_data):
+    """Canonical form of the search filters, so equivalent searches compare equal."""
+    query = {}
+    for field in QUERY_FIELDS:
+        value = user_data.get(field)
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+            if value in ("", "-"):  # "-" means the user skipped the step
+                value = None
+        query[field] = value
+
+    for field in NUMERIC_FIELDS:
+        value = query[field]
+        if value is not None:
+            query[field] = int(value) if str(value).isdigit() else None
+    return query
+
+
+def query_key(user_data):
+    return json.dumps(normalize_query(user_data), sort_keys=True, ensure_ascii=False)
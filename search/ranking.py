@@ -0,0 +1,145 @@
+import math
+from bisect import bisect_left
+from collections import Counter
+
+from parsers.resume import IGNORED, WORD_RE, experience_years, parse_salary, words
+
+# How much one occurrence of a word counts in each part of a resume
+POSITION_WEIGHT = 3.0
+SKILL_WEIGHT = 2.0
+EXPERIENCE_TITLE_WEIGHT = 1.0
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Share of the final score: text relevance is scaled to 0..1 within the batch, the fits are 0..1
+TEXT_WEIGHT = 1.0
+SALARY_WEIGHT = 0.3
+EXPERIENCE_WEIGHT = 0.3
+
+
+def term_weights(resume):
+    """Words of the position, skills and experience titles with their field-weighted counts."""
+    weights = {}
+    fields = (
+        (resume.position, POSITION_WEIGHT),
+        (" ".join(resume.skills), SKILL_WEIGHT),
+        (" ".join(entry.title for entry in resume.experience), EXPERIENCE_TITLE_WEIGHT),
+    )
+    for text, weight in fields:
+        # One findall and a Counter per field rather than a Python loop per word
+        for word, count in Counter(WORD_RE.findall(text.casefold())).items():
+            weights[word] = weights.get(word, 0.0) + weight * count
+    for word in IGNORED.intersection(weights):
+        del weights[word]
+    return weights
+
+
+class RankingIndex:
+    """Term statistics and salary/experience figures of a batch of resumes, for ranking them.
+
+    Resumes are added one at a time as a search finds them, so the per-resume work is done while
+    the rest are still downloading; rank() then only touches the postings of the query terms.
+    """
+
+    def __init__(self, resumes=()):
+        self.resumes = []
+        self.postings = {}  # word -> [(resume index, weighted count)]
+        self.lengths = []
+        self.total_length = 0.0
+        self.salaries = []  # Asked salary, None if not given
+        self.years = []  # Years of experience
+        self._vocabulary = None  # Sorted words, rebuilt after adding
+        for resume in resumes:
+            self.add(resume)
+
+    def __len__(self):
+        return len(self.resumes)
+
+    def add(self, resume):
+        index = len(self.resumes)
+        self.resumes.append(resume)
+        weights = term_weights(resume)
+        for word, weight in weights.items():
+            self.postings.setdefault(word, []).append((index, weight))
+        length = sum(weights.values())
+        self.lengths.append(length)
+        self.total_length += length
+        self.salaries.append(parse_salary(resume.salary_expectation))
+        self.years.append(experience_years(resume))
+        self._vocabulary = None
+
+    def expand(self, term):
+        # Every word starting with term, so "дизайн" finds "дизайнер" and "дизайнерка"
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        start = end = bisect_left(vocabulary, term)
+        while end < len(vocabulary) and vocabulary[end].startswith(term):
+            end += 1
+        return vocabulary[start:end]
+
+    def bm25(self, query_terms):
+        """BM25 score of every resume, in the order they were added."""
+        count = len(self.resumes)
+        scores = [0.0] * count
+        if not count or not self.total_length:
+            return scores
+        avg_length = self.total_length / count
+        norms = [K1 * (1 - B + B * length / avg_length) for length in self.lengths]
+
+        for term in set(query_terms):
+            frequencies = {}
+            for word in self.expand(term):
+                for index, weight in self.postings[word]:
+                    frequencies[index] = frequencies.get(index, 0.0) + weight
+            if not frequencies:
+                continue
+
+            idf = math.log(1 + (count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            for index, frequency in frequencies.items():
+                scores[index] += idf * frequency * (K1 + 1) / (frequency + norms[index])
+        return scores
+
+    def rank(self, query, limit=None):
+        """The resumes best match first for query, the filters from search.query.normalize_query.
+
+        Text relevance is BM25 of job_position and keywords over the whole batch, with salary and
+        experience fit added on top. Resumes that score the same keep their order.
+        """
+        query_terms = words(" ".join(filter(None, (query.get("job_position"), query.get("keywords")))))
+        text_scores = self.bm25(query_terms)
+        best_text = max(text_scores, default=0.0) or 1.0
+        budget = query.get("salary")
+        wanted = query.get("years_of_experience")
+
+        scores = [
+            TEXT_WEIGHT * text_score / best_text
+            + SALARY_WEIGHT * salary_fit(asked, budget)
+            + EXPERIENCE_WEIGHT * experience_fit(years, wanted)
+            for text_score, asked, years in zip(text_scores, self.salaries, self.years)
+        ]
+        order = sorted(range(len(scores)), key=lambda index: -scores[index])
+        return [self.resumes[index] for index in order[:limit]]
+
+
+def salary_fit(asked, budget):
+    # 1 within the budget, falling to 0 at twice the budget; resumes without a salary sit in between
+    if not budget:
+        return 0.0
+    if asked is None:
+        return 0.5
+    if asked <= budget:
+        return 1.0
+    return max(0.0, 1 - (asked - budget) / budget)
+
+
+def experience_fit(years, wanted):
+    if not wanted:
+        return 0.0
+    return min(1.0, years / wanted)
+
+
+def rank(resumes, query, limit=None):
+    return RankingIndex(resumes).rank(query, limit)
@@ -0,0 +1,32 @@
+import time
+from collections import OrderedDict
+
+
+class SearchResultCache:
+    """Ordered result lists of recent searches, keyed by the normalized query."""
+
+    def __init__(self, ttl=600, max_entries=500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires at, results)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, results, ttl=None):
+        # ttl overrides the default, e.g. for results prefetched hours before they are needed
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, list(results))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
@@ -0,0 +1,62 @@
+import datetime
+
+from parsers import http_client
+from search.query import query_key
+
+
+def parse_hours(text):
+    # "1-6,22-24" -> [(1, 6), (22, 24)], hours of the local day, end exclusive
+    windows = []
+    for part in text.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            windows.append((int(start), int(end)))
+    return windows
+
+
+class CacheWarmer:
+    """Prefetches the most popular searches into the result cache during off-peak hours.
+
+    fetch(user_data) runs one search and returns its results (None on failure). Each day's warming
+    stops once daily_budget HTTP requests have gone out; the budget is checked between searches.
+    """
+
+    def __init__(self, history, cache, fetch, hours="1-6", daily_budget=500, max_queries=20, ttl=12 * 3600):
+        self.history = history
+        self.cache = cache
+        self.fetch = fetch
+        self.windows = parse_hours(hours)
+        self.daily_budget = daily_budget
+        self.max_queries = max_queries
+        self.ttl = ttl
+        self.budget_day = None
+        self.used = 0
+
+    def is_off_peak(self, now=None):
+        hour = (now or datetime.datetime.now()).hour
+        return any(start <= hour < end for start, end in self.windows)
+
+    async def run(self):
+        now = datetime.datetime.now()
+        if not self.is_off_peak(now):
+            return
+        if self.budget_day != now.date():
+            self.budget_day, self.used = now.date(), 0
+
+        warmed = 0
+        for user_data in self.history.popular(self.max_queries):
+            key = query_key(user_data)
+            if self.cache.get(key) is not None:
+                continue  # Still warm from an earlier run
+            if self.used >= self.daily_budget:
+                print(f"Cache warming budget of {self.daily_budget} requests used up for today.")
+                break
+
+            with http_client.count_requests() as counter:
+                resumes = await self.fetch(user_data)
+            self.used += counter["requests"]
+            if resumes is not None:
+                self.cache.put(key, resumes, ttl=self.ttl)
+                warmed += 1
+        if warmed:
+            print(f"Warmed {warmed} searches, {self.used}/{self.daily_budget} requests used today.")
@@ -0,0 +1,7 @@
+import os
+
+# main.py reads its settings on import: a dummy bot token, and no files written by the tests
+os.environ.setdefault("TOKEN", "123:abc")
+for name in ("HTTP_CACHE_PATH", "RESUME_CACHE_PATH", "RESUME_STORE_PATH", "SEARCH_HISTORY_PATH"):
+    os.environ.setdefault(name, "")
+os.environ.setdefault("PARSE_PROCESSES", "0")  # Parse in threads, where the tests' stubs are visible
@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from parsers import http_client
+from parsers.resume import ExperienceEntry, Resume
+from parsers.singleflight import SingleFlight
+from search.federated import FederatedSearch
+from search.limits import SearchLimiter
+from search.result_cache import SearchResultCache
+
+
+class Message:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def reply_text(self, text):
+        self.sent.append(text)
+        return Message(self.sent)
+
+    async def edit_text(self, text):
+        self.sent.append(text)
+
+
+class User:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class Update:
+    def __init__(self, user_id):
+        self.sent = []
+        self.message = Message(self.sent)
+        self.effective_user = User(user_id)
+
+
+class Context:
+    def __init__(self):
+        self.user_data = {
+            "job_position": "Дизайнер", "location": "Київ", "salary": "-", "years_of_experience": "-",
+            "english_language": "-", "keywords": "-", "site": "Work.ua",
+        }
+
+
+class FakeParser:
+    def __init__(self, searches):
+        self.searches = searches
+
+    async def aiter_resumes(self, num_pages=1):
+        self.searches.append(1)
+        await asyncio.sleep(0.01)
+        for number in range(3):
+            yield Resume(
+                position="Дизайнер",
+                location="Київ",
+                experience=[ExperienceEntry("Дизайнер", f"Company {number}", "2 роки")],
+                link=f"https://www.work.ua/resumes/{number}/",
+                site="Work.ua",
+            )
+
+
+build_parser = main.build_parser
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    searches = []
+    monkeypatch.setattr(main, "build_parser", lambda user_data: FakeParser(searches))
+    monkeypatch.setattr(main, "search_limiter", SearchLimiter(max_searches=2, max_per_user=1))
+    monkeypatch.setattr(main, "search_cache", SearchResultCache())
+    monkeypatch.setattr(main, "search_flights", SingleFlight())
+    return searches
+
+
+def resumes_sent(update):
+    return [text for text in update.sent if text.startswith("\nResume ")]
+
+
+async def while_the_bot_is_full(*searches):
+    # Other users hold both slots, so the searches queue and then start together
+    busy = asyncio.Event()
+
+    async def occupy(user_id):
+        async with main.search_limiter.slot(user_id):
+            await busy.wait()
+
+    blockers = [asyncio.ensure_future(occupy(user_id)) for user_id in (100, 101)]
+    await asyncio.sleep(0)
+    tasks = [asyncio.ensure_future(search) for search in searches]
+    await asyncio.sleep(0.01)
+    busy.set()
+    await asyncio.gather(*blockers, *tasks)
+
+
+def test_identical_queued_searches_both_get_results(searches):
+    first, second = Update(1), Update(2)
+    asyncio.run(while_the_bot_is_full(main.run_search(first, Context()), main.run_search(second, Context())))
+    assert len(searches) == 1
+    assert len(resumes_sent(first)) == 3
+    assert len(resumes_sent(second)) == 3
+
+
+def test_search_queued_behind_the_cache_warmer_gets_results(searches):
+    async def warm_later():
+        await asyncio.sleep(0.005)  # The user's search is already queued for a slot
+        await main.warm_search(Context().user_data)
+
+    update = Update(1)
+    asyncio.run(while_the_bot_is_full(main.run_search(update, Context()), warm_later()))
+    assert len(searches) == 1
+    assert len(resumes_sent(update)) == 3
+
+
+def skipped_search(site):
+    # Every step answered with "-", as the conversation stores it
+    return {
+        "job_position": "-", "location": "-", "salary": None, "years_of_experience": None,
+        "english_language": "-", "keywords": "-", "site": site,
+    }
+
+
+def test_skipped_steps_keep_robota_ua_defaults():
+    parser = main.build_parser(skipped_search("Robota.ua"))
+    payload = parser.build_payload(0)
+    assert parser.job_position == "3D Designer"
+    assert payload["languages"] == ["1"]  # English required, as before the parsers took None
+    assert payload["keyWords"] == "3D Designer"
+
+
+def test_skipped_steps_build_a_work_ua_search():
+    parser = main.build_parser(skipped_search("Work.ua"))
+    assert parser.build_search_url(2) == "https://www.work.ua/resumes/?page=2"
+
+    parser = main.build_parser({**skipped_search("Work.ua"), "location": "kyiv", "keywords": "figma"})
+    assert parser.build_search_url(1).startswith("https://www.work.ua/resumes-kyiv-figma/?notitle=1")
+
+
+def sites_down(monkeypatch):
+    async def arequest(method, url, **kwargs):
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(http_client, "arequest", arequest)
+
+
+def test_search_of_all_sites_reports_failed_sites_and_is_not_cached(searches, monkeypatch):
+    # The real parsers, whose requests all fail: they skip them rather than raise
+    monkeypatch.setattr(main, "build_parser", build_parser)
+    sites_down(monkeypatch)
+    context = Context()
+    context.user_data["site"] = main.ALL_SITES
+    update = Update(1)
+    asyncio.run(main.run_search(update, context))
+
+    failed = [text for text in update.sent if "timed out or failed" in text]
+    assert len(failed) == 1 and "Work.ua" in failed[0] and "Robota.ua" in failed[0]
+    assert main.search_cache.get(main.query_key(context.user_data)) is None
+    assert asyncio.run(main.fetch_results(context.user_data)) is None
+
+
+def test_failed_single_site_search_is_not_cached(searches, monkeypatch):
+    monkeypatch.setattr(main, "build_parser", build_parser)
+    sites_down(monkeypatch)
+    context = Context()
+    context.user_data["site"] = "Robota.ua"
+    update = Update(1)
+    asyncio.run(main.run_search(update, context))
+
+    assert any("Robota.ua timed out or failed" in text for text in update.sent)
+    assert main.search_cache.get(main.query_key(context.user_data)) is None
+
+
+def test_refresh_skips_cached_pages(searches, monkeypatch):
+    refreshed = []
+
+    class Parser(FakeParser):
+        def aiter_resumes(self, num_pages=1):
+            refreshed.append(http_client._no_cache.get())
+            return super().aiter_resumes(num_pages)
+
+    monkeypatch.setattr(main, "build_parser", lambda user_data: Parser(searches))
+    context = Context()
+    asyncio.run(main.run_search(Update(1), context))
+    asyncio.run(main.refresh_command(Update(1), context))
+    assert refreshed == [False, True]
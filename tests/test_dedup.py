@@ -0,0 +1,126 @@
+import asyncio
+
+from parsers.dedup import DuplicateFilter
+from parsers.resume import ExperienceEntry, Resume
+from parsers.resume_store import ResumeStore
+from parsers.source import ResumeSource
+
+
+def work_ua_resume(number=1):
+    return Resume(
+        position="UX/UI дизайнер",
+        location="Київ",
+        salary_expectation="25000 грн",
+        skills=("Figma", "Photoshop"),
+        experience=[
+            ExperienceEntry("UX дизайнер (2 роки 3 місяці)", "SoftServe", "2 роки 3 місяці"),
+            ExperienceEntry("Графічний дизайнер (1 рік)", "Ciklum", "1 рік"),
+        ],
+        link=f"https://www.work.ua/resumes/{number}/",
+        site="Work.ua",
+    )
+
+
+def robota_ua_copy(number=9):
+    # The same person on Robota.ua: Russian durations, no skills, no duration in the titles
+    return Resume(
+        position="UX/UI дизайнер",
+        location="Київ",
+        salary_expectation="25000",
+        experience=[
+            ExperienceEntry("UX дизайнер", "SoftServe", "2 года 3 месяца"),
+            ExperienceEntry("Графічний дизайнер", "Ciklum", "1 год"),
+        ],
+        link=f"https://robota.ua/ru/candidates/{number}",
+        site="Robota.ua",
+    )
+
+
+def same_title_people(count):
+    # Different people with the same title in the same city, some with no experience listed
+    people = []
+    for number in range(count):
+        experience = [] if number % 3 == 0 else [ExperienceEntry("Дизайнер", f"Company {number}", "2 роки")]
+        people.append(Resume(
+            position="Дизайнер",
+            location="Київ",
+            experience=experience,
+            link=f"https://robota.ua/ru/candidates/{100 + number}",
+            site="Robota.ua",
+        ))
+    return people
+
+
+class StubSource(ResumeSource):
+    def __init__(self, resumes):
+        self.resumes = resumes
+
+    def iter_resumes(self, num_pages=10):
+        yield from self.resumes
+
+    async def aiter_resumes(self, num_pages=10):
+        for resume in self.resumes:
+            yield resume
+
+
+def test_cross_site_copy_is_a_duplicate():
+    duplicates = DuplicateFilter()
+    assert not duplicates.is_duplicate(work_ua_resume())
+    assert duplicates.is_duplicate(robota_ua_copy())
+
+
+def test_same_link_is_a_duplicate():
+    duplicates = DuplicateFilter()
+    assert not duplicates.is_duplicate(work_ua_resume())
+    assert duplicates.is_duplicate(work_ua_resume())
+
+
+def test_same_title_and_city_are_different_people():
+    people = same_title_people(45)
+    assert StubSource(people).fetch_multiple_pages() == people
+    assert asyncio.run(StubSource(people).afetch_multiple_pages()) == people
+
+
+def test_same_company_different_period_are_different_people():
+    duplicates = DuplicateFilter()
+    first = Resume("Дизайнер", "Київ", experience=[ExperienceEntry("Дизайнер", "SoftServe", "2 роки")], link="a")
+    second = Resume("Дизайнер", "Київ", experience=[ExperienceEntry("Дизайнер", "SoftServe", "3 роки")], link="b")
+    assert not duplicates.is_duplicate(first)
+    assert not duplicates.is_duplicate(second)
+
+
+def test_copies_are_dropped_among_different_people():
+    resumes = [work_ua_resume(), *same_title_people(10), robota_ua_copy()]
+    assert StubSource(resumes).fetch_multiple_pages() == resumes[:-1]
+
+
+def test_store_groups_cross_site_copies(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.add("Work.ua", work_ua_resume())
+    store.add("Robota.ua", robota_ua_copy())
+    found = store.search(job_position="дизайнер")
+    assert len(found) == 1
+    assert found[0].link in (work_ua_resume().link, robota_ua_copy().link)
+    store.close()
+
+
+def test_store_keeps_same_title_people_apart(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    people = same_title_people(45)
+    store.add_many("Robota.ua", people)
+    assert len(store.search(job_position="дизайнер", limit=100)) == 45
+    store.close()
+
+
+def test_store_does_not_chain_candidates(tmp_path):
+    # b is a copy of a and c is a copy of b, but c is too far from a to be the same person
+    def resume(link, years):
+        experience = [ExperienceEntry("Дизайнер", f"Company {number}", f"{number} років") for number in years]
+        return Resume("Дизайнер", "Київ", experience=experience, link=link)
+
+    a, b, c = resume("a", range(1, 9)), resume("b", range(1, 10)), resume("c", range(2, 11))
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.add_many("Work.ua", [a, b, c])
+    links = [resume.link for resume in store.search(limit=10)]
+    assert len(links) == 2 and "c" in links
+    store.close()
@@ -0,0 +1,88 @@
+import pytest
+
+from parsers import http_cache
+from parsers.http_cache import ResponseCache
+
+RESUME_URL = "https://www.work.ua/resumes/123/"
+ROBOTA_URL = "https://employer-api.robota.ua/cvdb/resumes"
+
+
+class Response:
+    def __init__(self, status_code=200, text="<html>resume</html>", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(http_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_only_known_endpoints_are_cached(cache):
+    assert cache.lookup("GET", "https://example.com/") is None
+    assert cache.lookup("GET", RESUME_URL) is not None
+
+
+def test_fresh_entry_is_served_until_its_ttl(cache, clock):
+    lookup = cache.lookup("GET", RESUME_URL)
+    assert not lookup.is_fresh()
+    cache.complete(lookup, Response(text="page"))
+
+    lookup = cache.lookup("GET", RESUME_URL)
+    assert lookup.is_fresh()
+    assert lookup.response().text == "page"
+    assert lookup.response().from_cache
+
+    clock[0] += cache.ttl_for(RESUME_URL) + 1
+    assert not cache.lookup("GET", RESUME_URL).is_fresh()
+
+
+def test_payload_key_ignores_key_order(cache):
+    cache.complete(cache.lookup("POST", ROBOTA_URL, {"page": 1, "keyWords": "designer"}), Response(text="{}"))
+    assert cache.lookup("POST", ROBOTA_URL, {"keyWords": "designer", "page": 1}).is_fresh()
+    assert not cache.lookup("POST", ROBOTA_URL, {"keyWords": "designer", "page": 2}).is_fresh()
+
+
+def test_stale_entry_is_revalidated(cache, clock):
+    cache.complete(cache.lookup("GET", RESUME_URL), Response(text="page", headers={"etag": '"v1"'}))
+    clock[0] += cache.ttl_for(RESUME_URL) + 1
+
+    lookup = cache.lookup("GET", RESUME_URL)
+    assert lookup.conditional_headers() == {"If-None-Match": '"v1"'}
+    response = cache.complete(lookup, Response(status_code=304, text=""))
+    assert response.text == "page"
+    assert cache.lookup("GET", RESUME_URL).is_fresh()
+
+
+def test_errors_and_no_store_are_not_cached(cache):
+    cache.complete(cache.lookup("GET", RESUME_URL), Response(status_code=500))
+    assert cache.lookup("GET", RESUME_URL).entry is None
+    cache.complete(cache.lookup("GET", RESUME_URL), Response(headers={"cache-control": "no-store"}))
+    assert cache.lookup("GET", RESUME_URL).entry is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_bytes=250)
+    urls = [f"https://www.work.ua/resumes/{number}/" for number in range(3)]
+    for url in urls[:2]:
+        clock[0] += 1
+        cache.complete(cache.lookup("GET", url), Response(text="x" * 100))
+    clock[0] += 1
+    cache.lookup("GET", urls[0])  # Now more recently used than urls[1]
+    clock[0] += 1
+    cache.complete(cache.lookup("GET", urls[2]), Response(text="x" * 100))
+
+    assert cache.lookup("GET", urls[0]).entry is not None
+    assert cache.lookup("GET", urls[1]).entry is None
+    assert cache.lookup("GET", urls[2]).entry is not None
+    cache.close()
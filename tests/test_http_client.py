@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import httpx
+
+from parsers import http_cache, http_client
+
+
+async def current_client():
+    return http_client.get_async_client()
+
+
+def test_client_of_a_running_loop_is_closed_when_replaced():
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        old_client = asyncio.run_coroutine_threadsafe(current_client(), other_loop).result(1)
+
+        async def replace():
+            client = http_client.get_async_client()
+            await asyncio.sleep(0.05)  # The old loop closes its client meanwhile
+            await http_client.aclose()
+            return client
+
+        new_client = asyncio.run(replace())
+        assert new_client is not old_client
+        assert old_client.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(1)
+        other_loop.close()
+        http_client._async_client = http_client._async_loop = None
+
+
+def test_same_loop_keeps_its_client():
+    async def twice():
+        try:
+            return http_client.get_async_client() is http_client.get_async_client()
+        finally:
+            await http_client.aclose()
+
+    assert asyncio.run(twice())
+
+
+def test_no_cache_revalidates_fresh_pages(tmp_path, monkeypatch):
+    url = "https://www.work.ua/resumes-дизайнер/?page=1"
+    cache = http_cache.ResponseCache(str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setattr(http_cache, "get_response_cache", lambda: cache)
+    sent = []
+
+    async def send(method, url, **kwargs):
+        sent.append(kwargs.get("headers") or {})
+        if len(sent) == 1:
+            return httpx.Response(200, text="page", headers={"etag": '"v1"'})
+        return httpx.Response(304)
+
+    monkeypatch.setattr(http_client, "_asend", send)
+
+    async def search_twice_and_refresh():
+        first = await http_client.aget(url)
+        second = await http_client.aget(url)
+        with http_client.no_cache():
+            refreshed = await http_client.aget(url)
+        return first, second, refreshed
+
+    first, second, refreshed = asyncio.run(search_twice_and_refresh())
+    assert [first.text, second.text, refreshed.text] == ["page", "page", "page"]
+    assert len(sent) == 2  # The second search was a cache hit, the refresh asked the site again
+    assert sent[1]["If-None-Match"] == '"v1"'
+    cache.close()
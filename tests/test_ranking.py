@@ -0,0 +1,73 @@
+import pytest
+
+from parsers.resume import ExperienceEntry, Resume, words
+from search.ranking import RankingIndex, experience_fit, rank, salary_fit
+
+
+def resume(link, position="Not specified", skills=(), salary="", years=None, titles=()):
+    experience = [ExperienceEntry(title, "Company", "") for title in titles]
+    if years:
+        experience.append(ExperienceEntry("Job", "Company", f"{years} роки"))
+    return Resume(position, "Київ", salary, skills, experience, link=link)
+
+
+def query(position=None, keywords=None, salary=None, years=None):
+    return {"job_position": position, "keywords": keywords, "salary": salary, "years_of_experience": years}
+
+
+def links(resumes):
+    return [resume.link for resume in resumes]
+
+
+def test_words_drop_placeholders():
+    assert words("Not specified") == []
+    assert words("UX/UI Дизайнер, N/A") == ["ux", "ui", "дизайнер"]
+
+
+def test_position_outweighs_skills_and_past_titles():
+    resumes = [
+        resume("none", "Java developer"),
+        resume("title", "Developer", titles=["Python developer"]),
+        resume("skill", "Developer", skills=["Python"]),
+        resume("position", "Python developer"),
+    ]
+    assert links(rank(resumes, query("python"))) == ["position", "skill", "title", "none"]
+
+
+def test_query_words_match_longer_words():
+    index = RankingIndex([resume("a", "Дизайнер"), resume("b", "Дизайнерка інтер'єру"), resume("c", "Розробник")])
+    assert index.expand("дизайн") == ["дизайнер", "дизайнерка"]
+    assert links(index.rank(query("дизайн"), limit=2)) == ["a", "b"]
+
+    index.add(resume("d", "Дизайн-менеджер"))  # The vocabulary is rebuilt after adding
+    assert index.expand("дизайн") == ["дизайн", "дизайнер", "дизайнерка"]
+
+
+def test_salary_fit():
+    assert salary_fit(20000, None) == 0
+    assert salary_fit(None, 30000) == 0.5
+    assert salary_fit(30000, 30000) == 1
+    assert salary_fit(45000, 30000) == pytest.approx(0.5)
+    assert salary_fit(90000, 30000) == 0
+
+
+def test_experience_fit():
+    assert experience_fit(5, None) == 0
+    assert experience_fit(1.5, 3) == 0.5
+    assert experience_fit(6, 3) == 1
+
+
+def test_salary_and_experience_break_equal_text_scores():
+    resumes = [
+        resume("pricey", "Дизайнер", salary="60 000 грн"),
+        resume("junior", "Дизайнер", salary="25 000 грн", years=1),
+        resume("fits", "Дизайнер", salary="25 000 грн", years=4),
+    ]
+    assert links(rank(resumes, query("дизайнер", salary=30000, years=3))) == ["fits", "junior", "pricey"]
+
+
+def test_ties_keep_their_order_and_limit_cuts():
+    resumes = [resume(str(number), "Дизайнер") for number in range(5)]
+    assert links(rank(resumes, query("дизайнер"))) == ["0", "1", "2", "3", "4"]
+    assert links(rank(resumes, query("дизайнер"), limit=2)) == ["0", "1"]
+    assert rank([], query("дизайнер")) == []
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from parsers import rate_limit
+from parsers.rate_limit import AdaptiveConcurrency, HostLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def respond(concurrency, latencies, status_code=200):
+    for latency in latencies:
+        concurrency.in_flight += 1
+        concurrency.release(latency, status_code)
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, pytest.approx(0.1), pytest.approx(0.2)]
+    clock[0] += 10
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.1)]  # Refilled up to the burst only
+
+
+def test_throttling_halves_the_limit_once_per_cooldown(clock):
+    concurrency = AdaptiveConcurrency(initial=8, cooldown=1.0)
+    respond(concurrency, [0.1, 0.1], status_code=429)
+    assert concurrency.limit == 4
+    clock[0] += 1
+    respond(concurrency, [None], status_code=None)  # A network error
+    assert concurrency.limit == 2
+
+
+def test_healthy_responses_grow_the_limit_to_the_maximum(clock):
+    concurrency = AdaptiveConcurrency(initial=2, maximum=6)
+    respond(concurrency, [0.1] * 2)
+    assert concurrency.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    respond(concurrency, [0.1] * 100)
+    assert concurrency.limit == 6
+
+
+def test_one_slow_response_is_not_throttled(clock):
+    concurrency = AdaptiveConcurrency(initial=4)
+    respond(concurrency, [0.1] * 20 + [0.5])
+    assert concurrency.limit > 4
+
+
+def test_lasting_slowdown_backs_off_then_becomes_the_new_baseline():
+    concurrency = AdaptiveConcurrency(initial=4, cooldown=0)
+    respond(concurrency, [0.1] * 5 + [1.0] * 5)
+    assert concurrency.limit == 1
+    respond(concurrency, [1.0] * 200)
+    assert concurrency.limit == 10
+    assert concurrency.baseline_latency == pytest.approx(1.0, rel=0.01)
+
+
+def test_moderate_latency_shift_does_not_pin_the_limit():
+    concurrency = AdaptiveConcurrency(initial=4, cooldown=0)
+    respond(concurrency, [0.1] * 5 + [0.25] * 500)
+    assert concurrency.limit == 10
+    assert concurrency.baseline_latency == pytest.approx(0.25, rel=0.01)
+
+
+def test_cancelled_requests_leave_the_limit_alone(clock):
+    concurrency = AdaptiveConcurrency(initial=4)
+    concurrency.in_flight = 1
+    concurrency.release(cancelled=True)
+    assert concurrency.limit == 4
+    assert concurrency.in_flight == 0
+
+
+def test_waiting_coroutine_gets_the_freed_slot():
+    async def main():
+        concurrency = AdaptiveConcurrency(initial=1)
+        await concurrency.aacquire()
+        waiter = asyncio.ensure_future(concurrency.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        concurrency.release(0.1, 200)
+        await asyncio.wait_for(waiter, 1)
+        return concurrency.in_flight
+
+    assert asyncio.run(main()) == 1
+
+
+def test_cancelled_waiter_takes_no_slot():
+    async def main():
+        concurrency = AdaptiveConcurrency(initial=1)
+        await concurrency.aacquire()
+        waiter = asyncio.ensure_future(concurrency.aacquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        concurrency.release(0.1, 200)
+        assert concurrency.in_flight == 0
+        await asyncio.wait_for(concurrency.aacquire(), 1)  # The slot is still free for others
+        return concurrency.in_flight
+
+    assert asyncio.run(main()) == 1
+
+
+def test_cancelled_while_rate_limited_returns_the_slot():
+    async def main():
+        limiter = HostLimiter(rate=1, burst=1, max_concurrency=4)
+        await limiter.aacquire()
+        queued = asyncio.ensure_future(limiter.aacquire())  # Waits about a second for a token
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.sleep(0)
+        return limiter.concurrency
+
+    concurrency = asyncio.run(main())
+    assert concurrency.in_flight == 1
+    assert concurrency.limit == 4
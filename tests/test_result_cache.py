@@ -0,0 +1,46 @@
+import pytest
+
+from search import result_cache
+from search.result_cache import SearchResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_results_expire_after_ttl(clock):
+    cache = SearchResultCache(ttl=60)
+    cache.put("key", ["a", "b"])
+    clock[0] += 59
+    assert cache.get("key") == ["a", "b"]
+    clock[0] += 1
+    assert cache.get("key") is None
+
+
+def test_ttl_can_be_overridden_per_entry(clock):
+    cache = SearchResultCache(ttl=60)
+    cache.put("key", ["a"], ttl=3600)
+    clock[0] += 600
+    assert cache.get("key") == ["a"]
+
+
+def test_least_recently_used_entries_are_dropped(clock):
+    cache = SearchResultCache(max_entries=2)
+    cache.put("first", ["a"])
+    cache.put("second", ["b"])
+    cache.get("first")
+    cache.put("third", ["c"])
+    assert cache.get("second") is None
+    assert cache.get("first") == ["a"]
+    assert cache.get("third") == ["c"]
+
+
+def test_invalidate_drops_the_entry(clock):
+    cache = SearchResultCache()
+    cache.put("key", ["a"])
+    cache.invalidate("key")
+    cache.invalidate("missing")
+    assert cache.get("key") is None
@@ -0,0 +1,45 @@
+from parsers.resume import ExperienceEntry, Resume
+from parsers.resume_cache import ResumeCache, content_hash
+
+URL = "https://www.work.ua/resumes/1/"
+
+
+def resume(position="Дизайнер"):
+    return Resume(position, "Київ", skills=("Figma",), experience=[ExperienceEntry("Дизайнер", "SoftServe", "2 роки")], link=URL)
+
+
+def test_changed_page_is_a_miss():
+    cache = ResumeCache("")
+    cache.put(URL, content_hash("<html>v1</html>"), resume())
+    assert cache.get(URL, content_hash("<html>v1</html>")) == resume()
+    assert cache.get(URL, content_hash("<html>v2</html>")) is None
+
+
+def test_memory_tier_is_least_recently_used():
+    cache = ResumeCache("", memory_size=2)
+    for number in range(2):
+        cache.put(f"{URL}{number}", "hash", resume())
+    cache.get(f"{URL}0", "hash")
+    cache.put(f"{URL}2", "hash", resume())
+    assert cache.get(f"{URL}0", "hash") is not None
+    assert cache.get(f"{URL}1", "hash") is None
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "resumes.sqlite3")
+    cache = ResumeCache(path)
+    cache.put(URL, "hash", resume("UX дизайнер"))
+    cache.close()
+
+    cache = ResumeCache(path)
+    assert cache.get(URL, "hash") == resume("UX дизайнер")
+    assert cache.get(URL, "other") is None
+    cache.close()
+
+
+def test_sqlite_tier_keeps_max_entries(tmp_path):
+    cache = ResumeCache(str(tmp_path / "resumes.sqlite3"), memory_size=1, max_entries=2)
+    for number in range(3):
+        cache.put(f"{URL}{number}", "hash", resume())
+    assert cache._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0] == 2
+    cache.close()
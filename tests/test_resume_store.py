@@ -0,0 +1,82 @@
+import pytest
+
+from parsers import resume_store
+from parsers.resume import ExperienceEntry, Resume, parse_salary
+from parsers.resume_store import ResumeStore
+
+
+def resume(link, position, location, salary, skills=(), years=None, add_info="Not specified"):
+    experience = [ExperienceEntry(position, f"Company {link}", f"{years} роки")] if years else []
+    return Resume(position, location, salary, skills, experience, add_info, link, "")
+
+
+RESUMES = {
+    "Work.ua": [
+        resume("ux", "UX/UI дизайнер", "Київ", "25 000 грн", skills=("Figma",), years=3),
+        resume("python", "Python розробник", "Київ", "Not specified", skills=("Django",), add_info="Англійська: вільно"),
+    ],
+    "Robota.ua": [
+        resume("graphic", "Графічний дизайнер", "Львов", "від 20 000 до 50 000 грн", years=1),
+        resume("interior", "Дизайнер інтер'єру", "Одеса", ""),
+        resume("senior", "Senior дизайнер", "Київ", "45 000", years=6),
+    ],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    for site, resumes in RESUMES.items():
+        store.add_many(site, resumes)
+    yield store
+    store.close()
+
+
+def links(resumes):
+    return {resume.link for resume in resumes}
+
+
+def test_salary_is_the_first_number():
+    assert parse_salary("від 20 000 до 30 000 грн") == 20000
+    assert parse_salary("25 000 грн") == 25000
+    assert parse_salary("30000") == 30000
+    assert parse_salary(45000) == 45000
+    assert parse_salary("Not specified") is None
+
+
+def test_position_matches_word_prefixes(store):
+    assert links(store.search(job_position="дизайн")) == {"ux", "graphic", "interior", "senior"}
+    assert links(store.search(job_position="python розроб")) == {"python"}
+
+
+def test_keywords_match_skills_and_english_matches_any_text(store):
+    assert links(store.search(keywords="figma")) == {"ux"}
+    assert links(store.search(english_language=True)) == {"python"}
+
+
+def test_city_aliases(store):
+    assert links(store.search(location="kyiv")) == {"ux", "python", "senior"}
+    assert links(store.search(location="lviv")) == {"graphic"}
+    assert len(store.search(location="ukraine")) == 5
+
+
+def test_salary_keeps_resumes_without_one(store):
+    assert links(store.search(job_position="дизайн", salary=30000)) == {"ux", "graphic", "interior"}
+
+
+def test_years_of_experience_and_site(store):
+    assert links(store.search(years_of_experience=2)) == {"ux", "senior"}
+    assert links(store.search(site="Robota.ua")) == {"graphic", "interior", "senior"}
+
+
+def test_max_age_drops_resumes_not_seen_lately(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resume_store.time, "time", lambda: now[0])
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.add("Work.ua", resume("old", "Дизайнер", "Київ", ""))
+    now[0] += 7200
+    store.add("Work.ua", resume("new", "Дизайнер", "Київ", ""))
+    assert links(store.search(max_age=3600)) == {"new"}
+    store.add("Work.ua", resume("old", "Дизайнер", "Київ", ""))  # Seen again
+    assert links(store.search(max_age=3600)) == {"old", "new"}
+    store.close()
@@ -0,0 +1,131 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from parsers import http_client, rate_limit, retry
+from parsers.retry import RetryPolicy
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "settings", {"retry_backoff": 0, "retry_backoff_max": 0})
+
+
+def test_retryable_statuses_and_errors_back_off_with_jitter():
+    policy = RetryPolicy(retries=3, backoff_base=0.5, backoff_max=10)
+    assert policy.delay(0, Response(200)) is None
+    assert policy.delay(0, Response(404)) is None
+    assert 0 <= policy.delay(0, Response(503)) <= 0.5
+    assert 0 <= policy.delay(2, error=httpx.ConnectError("refused")) <= 2
+    assert policy.delay(3, Response(503)) is None  # Out of retries
+
+
+def test_retry_after_in_seconds_or_as_a_date():
+    policy = RetryPolicy(max_retry_after=30)
+    assert policy.delay(0, Response(429, {"retry-after": "7"})) == 7
+    date = email.utils.formatdate(time.time() + 20, usegmt=True)
+    assert policy.delay(0, Response(503, {"retry-after": date})) == pytest.approx(20, abs=1.5)
+    assert retry.retry_after(Response(503, {"retry-after": "soon"})) is None
+
+
+def test_too_long_retry_after_gives_up():
+    policy = RetryPolicy(max_retry_after=30)
+    assert policy.delay(0, Response(429, {"retry-after": "120"})) is None
+
+
+def stub_send(monkeypatch, outcomes):
+    calls = []
+
+    async def send(method, url, **kwargs):
+        calls.append(url)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(http_client, "_asend", send)
+    return calls
+
+
+def test_server_errors_are_retried_then_returned(monkeypatch):
+    calls = stub_send(monkeypatch, [httpx.Response(503), httpx.ConnectError("reset"), httpx.Response(200, text="ok")])
+    response = asyncio.run(http_client.aget("https://example.test/page", retries=3, hedge=0))
+    assert response.text == "ok"
+    assert len(calls) == 3
+
+    calls = stub_send(monkeypatch, [httpx.Response(502), httpx.Response(502)])
+    assert asyncio.run(http_client.aget("https://example.test/page", retries=1, hedge=0)).status_code == 502
+    assert len(calls) == 2
+
+
+def test_too_long_retry_after_returns_the_response(monkeypatch):
+    calls = stub_send(monkeypatch, [httpx.Response(429, headers={"retry-after": "3600"})])
+    assert asyncio.run(http_client.aget("https://example.test/page", hedge=0)).status_code == 429
+    assert len(calls) == 1
+
+
+class Client:
+    """Stands in for the httpx client: each request takes the next (seconds, outcome)."""
+
+    def __init__(self, attempts):
+        self.attempts = list(attempts)
+        self.cancelled = 0
+
+    async def request(self, method, url, **kwargs):
+        delay, outcome = self.attempts.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(200, text=outcome)
+
+
+def hedged_host(monkeypatch, host, attempts):
+    # The host answered in 10 ms lately, so a request taking longer gets a hedge
+    tracker = retry.LatencyTracker()
+    for _ in range(20):
+        tracker.add(0.01)
+    monkeypatch.setitem(retry._trackers, host, tracker)
+    client = Client(attempts)
+    monkeypatch.setattr(http_client, "get_async_client", lambda: client)
+    return client
+
+
+def test_hedge_wins_and_the_straggler_is_cancelled(monkeypatch):
+    client = hedged_host(monkeypatch, "hedge-wins.test", [(1.0, "first"), (0.01, "hedge")])
+    started = time.monotonic()
+    response = asyncio.run(http_client.aget("https://hedge-wins.test/page", retries=0, hedge=1))
+    assert response.text == "hedge"
+    assert time.monotonic() - started < 0.5
+    assert client.cancelled == 1
+
+    concurrency = rate_limit.get_host_limiter("hedge-wins.test", 10).concurrency
+    assert concurrency.in_flight == 0
+    assert concurrency.limit >= 4  # The cancelled request wasn't counted as a failure
+
+
+def test_fast_response_sends_no_hedge(monkeypatch):
+    client = hedged_host(monkeypatch, "hedge-fast.test", [(0, "first")])
+    assert asyncio.run(http_client.aget("https://hedge-fast.test/page", retries=0, hedge=1)).text == "first"
+    assert client.attempts == []
+
+
+def test_both_hedged_attempts_failing_raises(monkeypatch):
+    hedged_host(monkeypatch, "hedge-fails.test", [
+        (0.05, httpx.ConnectError("first failed")),
+        (0.06, httpx.ConnectError("hedge failed")),
+    ])
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(http_client.aget("https://hedge-fails.test/page", retries=0, hedge=1))
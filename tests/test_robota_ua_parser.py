@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from parsers import http_client, resume_store
+from parsers.resume_store import ResumeStore
+from parsers.robota_ua_parser import RobotaUaParser
+
+PAGE_SIZE = 20
+
+
+class JsonResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class Api:
+    """The Robota.ua search API with total matching resumes, PAGE_SIZE per page.
+
+    resumes holds (resume ID, update date), most recently updated first. Later pages answer
+    faster than earlier ones, so results arrive out of page order.
+    """
+
+    def __init__(self, total, delay=0.05):
+        self.resumes = [(number, "2026-10-01") for number in range(total)]
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def documents(self, page):
+        first = (page - 1) * PAGE_SIZE
+        return [
+            {"resumeId": number, "speciality": "Дизайнер", "cityName": "Київ", "updateDate": updated}
+            for number, updated in self.resumes[first:first + PAGE_SIZE]
+        ]
+
+    def started(self, page):
+        with self._lock:
+            self.requested.append(page)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        return self.delay / page
+
+    def finished(self, page):
+        with self._lock:
+            self.in_flight -= 1
+        return JsonResponse({"total": len(self.resumes), "documents": self.documents(page)})
+
+    def post(self, url, json=None, **kwargs):
+        time.sleep(self.started(json["page"]))
+        return self.finished(json["page"])
+
+    async def apost(self, url, json=None, **kwargs):
+        await asyncio.sleep(self.started(json["page"]))
+        return self.finished(json["page"])
+
+
+@pytest.fixture
+def api(monkeypatch):
+    def install(total):
+        api = Api(total)
+        monkeypatch.setattr(http_client, "post", api.post)
+        monkeypatch.setattr(http_client, "apost", api.apost)
+        return api
+    return install
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    monkeypatch.setattr(resume_store, "get_resume_store", lambda: store)
+    yield store
+    store.close()
+
+
+def search(parser, mode, num_pages=10):
+    if mode == "sync":
+        return list(parser.iter_resumes(num_pages))
+
+    async def collect():
+        return [resume async for resume in parser.aiter_resumes(num_pages)]
+    return asyncio.run(collect())
+
+
+def ids(resumes):
+    return [int(resume.link.rsplit("/", 1)[1]) for resume in resumes]
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_stops_at_the_last_page(api, mode):
+    site = api(45)
+    resumes = search(RobotaUaParser("Дизайнер"), mode)
+    assert sorted(site.requested) == [1, 2, 3]
+    assert ids(resumes) == list(range(45))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_pages_are_fetched_in_parallel_up_to_max_workers_and_kept_in_order(api, mode):
+    site = api(200)
+    resumes = search(RobotaUaParser("Дизайнер", max_workers=3), mode)
+    assert 1 < site.peak <= 3
+    assert sorted(site.requested) == list(range(1, 11))
+    assert ids(resumes) == list(range(200))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_num_pages_caps_the_search(api, mode):
+    site = api(200)
+    resumes = search(RobotaUaParser("Дизайнер"), mode, num_pages=2)
+    assert sorted(site.requested) == [1, 2]
+    assert len(resumes) == 40
+
+
+def test_closing_the_generator_drops_pages_not_started(api):
+    site = api(200)
+    resumes = RobotaUaParser("Дизайнер", max_workers=2).iter_resumes(10)
+    next(resumes)
+    resumes.close()
+    time.sleep(0.1)
+    assert sorted(site.requested) == [1, 2, 3]  # Page 1 and the two already in flight
+
+
+def test_closing_the_async_generator_cancels_its_tasks(api):
+    site = api(200)
+
+    async def first_then_close():
+        async with aclosing(RobotaUaParser("Дизайнер", max_workers=2).aiter_resumes(10)) as resumes:
+            async for _ in resumes:
+                break
+        await asyncio.sleep(0.1)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(first_then_close()) == []
+    assert len(site.requested) <= 3  # Page 1 and at most the two pages scheduled with it
+    assert site.in_flight == 0
+
+
+def crawl(parser, mode):
+    return parser.crawl() if mode == "sync" else asyncio.run(parser.acrawl())
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_crawl_stops_at_the_first_known_resume(api, store, mode):
+    site = api(45)
+    assert ids(crawl(RobotaUaParser("Дизайнер"), mode)) == list(range(45))
+    assert site.requested == [1, 2, 3]  # The short last page doesn't make it look like more pages follow
+
+    # A new resume and an updated one move to the top, everything after them is known
+    site.resumes.remove((7, "2026-10-01"))
+    site.resumes[:0] = [(45, "2026-10-02"), (7, "2026-10-02")]
+    site.requested.clear()
+    assert ids(crawl(RobotaUaParser("Дизайнер"), mode)) == [45, 7]
+    assert site.requested == [1]
+    assert store.count() == 46
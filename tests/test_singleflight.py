@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+from parsers.singleflight import SingleFlight, ThreadSingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def main():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.run_or_follow("key", fetch, 21) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert calls == [21]
+    assert results == [(42, True), (42, False), (42, False)]
+
+
+def test_finished_run_is_not_shared():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        flights = SingleFlight()
+        first = await flights.run("key", fetch)
+        assert flights.join("key") is None
+        return first, await flights.run("key", fetch)
+
+    assert asyncio.run(main()) == (1, 2)
+    assert len(calls) == 2
+
+
+def test_follower_giving_up_does_not_cancel_the_leader():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        flights = SingleFlight()
+        leader = asyncio.ensure_future(flights.run("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.run("key", fetch))
+        await asyncio.sleep(0)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_threads_share_one_run():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "page"
+
+    flights = ThreadSingleFlight()
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.run("url", fetch)))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=lambda: results.append(flights.run("url", fetch)))
+    follower.start()
+    time.sleep(0.05)  # Let the follower reach run() while the leader is still working
+    release.set()
+    leader.join()
+    follower.join()
+    assert calls == [1]
+    assert results == ["page", "page"]
@@ -0,0 +1,21 @@
+import pytest
+
+from parsers import registry
+from parsers.source import ResumeSource
+
+
+def test_source_must_implement_both_iterators():
+    class SyncOnly(ResumeSource):
+        def iter_resumes(self, num_pages=10):
+            yield from ()
+
+    with pytest.raises(TypeError):
+        SyncOnly()
+
+
+def test_registered_sources_implement_the_interface():
+    for site in registry.source_names():
+        source = registry.get_source(site)
+        assert issubclass(source, ResumeSource)
+        assert not source.__abstractmethods__
+        assert source.SITE_NAME == site
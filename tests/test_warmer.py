@@ -0,0 +1,87 @@
+import asyncio
+import datetime
+
+import main
+from parsers import http_client
+from search.history import SearchHistory
+from search.query import query_key
+from search.result_cache import SearchResultCache
+from search.warmer import CacheWarmer, parse_hours
+
+
+def search(position, site="Work.ua"):
+    return {
+        "job_position": position, "location": "-", "salary": None, "years_of_experience": None,
+        "english_language": "-", "keywords": "-", "site": site,
+    }
+
+
+class Fetch:
+    """Stands in for main.warm_search; each search makes requests_per_search requests."""
+
+    def __init__(self, requests_per_search=3, failing=()):
+        self.requests_per_search = requests_per_search
+        self.failing = failing
+        self.fetched = []
+
+    async def __call__(self, user_data):
+        self.fetched.append(user_data["job_position"])
+        for _ in range(self.requests_per_search):
+            http_client._count_request()
+        return None if user_data["job_position"] in self.failing else [user_data["job_position"]]
+
+
+def warmer(positions, fetch, **kwargs):
+    history = SearchHistory(":memory:")
+    for position in positions:
+        history.record(search(position))
+    return CacheWarmer(history, SearchResultCache(), fetch, hours="0-24", **kwargs)
+
+
+def test_parse_hours_and_off_peak():
+    assert parse_hours("1-6,22-24") == [(1, 6), (22, 24)]
+    assert parse_hours("") == []
+    night = CacheWarmer(None, None, None, hours="1-6,22-24")
+    assert [night.is_off_peak(datetime.datetime(2026, 10, 18, hour)) for hour in (0, 1, 5, 6, 22, 23)] == [
+        False, True, True, False, True, True,
+    ]
+    assert not CacheWarmer(None, None, None, hours="").is_off_peak()
+
+
+def test_popular_searches_are_cached_with_the_warm_ttl():
+    fetch = Fetch(failing={"tester"})
+    cache_warmer = warmer(["designer", "designer", "tester"], fetch, ttl=3600)
+    asyncio.run(cache_warmer.run())
+    assert fetch.fetched == ["designer", "tester"]  # Most popular first
+    assert cache_warmer.cache.get(query_key(search("designer"))) == ["designer"]
+    assert cache_warmer.cache.get(query_key(search("tester"))) is None  # Failed searches aren't cached
+
+
+def test_warm_searches_are_skipped():
+    fetch = Fetch()
+    cache_warmer = warmer(["designer", "designer", "tester"], fetch)
+    cache_warmer.cache.put(query_key(search("designer")), ["cached"])
+    asyncio.run(cache_warmer.run())
+    assert fetch.fetched == ["tester"]
+    assert cache_warmer.used == 3
+
+
+def test_daily_budget_counts_requests_and_resets_the_next_day():
+    fetch = Fetch(requests_per_search=3)
+    cache_warmer = warmer(["a", "a", "a", "b", "b", "c"], fetch, daily_budget=5)
+    asyncio.run(cache_warmer.run())
+    assert fetch.fetched == ["a", "b"]  # The budget is checked between searches
+    assert cache_warmer.used == 6
+
+    asyncio.run(cache_warmer.run())  # Same day: nothing left
+    assert fetch.fetched == ["a", "b"]
+
+    cache_warmer.budget_day -= datetime.timedelta(days=1)
+    asyncio.run(cache_warmer.run())
+    assert fetch.fetched == ["a", "b", "c"]
+    assert cache_warmer.used == 3
+
+
+def test_search_of_an_unregistered_site_does_not_stop_warming(monkeypatch):
+    monkeypatch.setattr(main, "search_flights", main.SingleFlight())
+    assert asyncio.run(main.fetch_results(search("designer", site="Jooble"))) is None
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from parsers.resume import NOT_SPECIFIED
+from parsers.work_ua_extractor import extract_resume
+from parsers.work_ua_parser import WorkUaParser
+
+FIXTURES = Path(__file__).parent / "fixtures"
+LINK = "https://www.work.ua/resumes/1/"
+
+# A resume with only a title: no salary, city, experience, skills or additional info
+BARE_RESUME = '<html><body><h2 class="mt-lg sm:mt-xl">Дизайнер</h2><dl><dt>Вік:</dt><dd>30</dd></dl></body></html>'
+
+
+def parse_with_beautifulsoup(html):
+    return WorkUaParser("designer").parse_resume(BeautifulSoup(html, "html.parser"), LINK)
+
+
+@pytest.mark.parametrize("html", [(FIXTURES / "work_ua_resume.html").read_text(encoding="utf-8"), BARE_RESUME])
+def test_single_pass_extractor_matches_beautifulsoup(html):
+    assert extract_resume(html, LINK) == parse_with_beautifulsoup(html)
+
+
+def test_extracted_fields():
+    resume = extract_resume((FIXTURES / "work_ua_resume.html").read_text(encoding="utf-8"), LINK)
+    assert resume.position == "UX/UI дизайнер"
+    assert resume.location == "Київ"
+    assert resume.salary_expectation == "25000\xa0грн"
+    assert resume.skills == ("Figma", "Adobe Photoshop", "UX research")
+    assert [(entry.name, entry.duration) for entry in resume.experience] == [
+        ("SoftServe", "2 роки 3 місяці"), ("Projector", "3 місяці"), ("Ciklum", "1 рік"),
+    ]
+    assert resume.experience[0].additional_info == "Дизайн мобільних застосунків & вебсервісівДослідження користувачів"
+    assert resume.add_info == "Портфоліо на Behance.Англійська — B2."
+    assert resume.site == "Work.ua"
+
+
+def test_missing_fields_are_not_specified():
+    resume = extract_resume(BARE_RESUME, LINK)
+    assert resume.salary_expectation == NOT_SPECIFIED
+    assert resume.experience == ()
+    assert resume.add_info == NOT_SPECIFIED
@@ -0,0 +1,170 @@
+import asyncio
+import re
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from parsers import http_client, resume_store
+from parsers.resume_store import ResumeStore
+from parsers.work_ua_parser import WorkUaParser
+
+CARD = '<div class="card card-hover card-search resume-link card-visited wordwrap"><a href="/resumes/{}/">CV</a></div>'
+RESUME = '<html><body><h2 class="mt-lg sm:mt-xl">Дизайнер {}</h2></body></html>'
+
+
+class Page:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class Site:
+    """Work.ua with pages search pages of per_page resumes; resume numbers in failing raise.
+
+    Resume pages further down a search page answer faster, so they finish out of order.
+    """
+
+    def __init__(self, pages, per_page=5, failing=(), delay=0.02):
+        self.pages = pages
+        self.per_page = per_page
+        self.failing = set(failing)
+        self.delay = delay
+        self.log = []
+        self._lock = threading.Lock()
+
+    def started(self, url):
+        resume = re.search(r"/resumes/(\d+)/$", url)
+        with self._lock:
+            self.log.append(("resume", int(resume[1])) if resume else ("search", int(url.rsplit("?page=", 1)[1])))
+        if resume:
+            return (self.per_page - int(resume[1]) % self.per_page) * self.delay
+        return 0
+
+    def finished(self, url):
+        resume = re.search(r"/resumes/(\d+)/$", url)
+        if resume:
+            number = int(resume[1])
+            with self._lock:
+                self.log.append(("done", number))
+            if number in self.failing:
+                raise ConnectionError("connection reset")
+            return Page(RESUME.format(number))
+
+        page = int(url.rsplit("?page=", 1)[1])
+        numbers = range(page * 100, page * 100 + self.per_page) if page <= self.pages else ()
+        return Page("<html><body>" + "".join(CARD.format(number) for number in numbers) + "</body></html>")
+
+    def get(self, url, **kwargs):
+        time.sleep(self.started(url))
+        return self.finished(url)
+
+    async def aget(self, url, **kwargs):
+        await asyncio.sleep(self.started(url))
+        return self.finished(url)
+
+    def requested(self, kind):
+        return [value for event, value in self.log if event == kind]
+
+
+@pytest.fixture
+def site(monkeypatch):
+    def install(*args, **kwargs):
+        site = Site(*args, **kwargs)
+        monkeypatch.setattr(http_client, "get", site.get)
+        monkeypatch.setattr(http_client, "aget", site.aget)
+        return site
+    return install
+
+
+def search(parser, mode, num_pages=10):
+    if mode == "sync":
+        return list(parser.iter_resumes(num_pages))
+
+    async def collect():
+        return [resume async for resume in parser.aiter_resumes(num_pages)]
+    return asyncio.run(collect())
+
+
+def numbers(resumes):
+    return [int(resume.position.split()[-1]) for resume in resumes]
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_resumes_keep_search_order(site, mode):
+    work_ua = site(3)
+    resumes = search(WorkUaParser("Дизайнер", max_workers=4), mode)
+    assert numbers(resumes) == [page * 100 + index for page in (1, 2, 3) for index in range(5)]
+    assert work_ua.requested("search") == [1, 2, 3, 4]  # Stops at the first empty page
+    assert resumes[0].link == "https://www.work.ua/resumes/100/"
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_next_search_page_is_fetched_while_resumes_load(site, mode):
+    work_ua = site(2)
+    search(WorkUaParser("Дизайнер", max_workers=2), mode)
+    first_resume_done = work_ua.log.index(next(event for event in work_ua.log if event[0] == "done"))
+    assert work_ua.log.index(("search", 2)) < first_resume_done
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_failed_resumes_are_skipped(site, mode):
+    site(1, failing={102})
+    parser = WorkUaParser("Дизайнер")
+    assert numbers(search(parser, mode)) == [100, 101, 103, 104]
+    assert parser.failed == ["Work.ua"]
+
+
+def wait_for_threads(count, timeout=2):
+    deadline = time.monotonic() + timeout
+    while threading.active_count() > count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return threading.active_count()
+
+
+def test_closing_the_generator_stops_its_threads(site):
+    work_ua = site(50)
+    threads = threading.active_count()
+    resumes = WorkUaParser("Дизайнер", max_workers=2).iter_resumes(50)
+    next(resumes)
+    resumes.close()
+
+    assert wait_for_threads(threads) == threads
+    fetched = len(work_ua.log)
+    time.sleep(0.1)
+    assert len(work_ua.log) == fetched
+    assert len(work_ua.requested("search")) < 10  # Held back by the queue, not walked to page 50
+
+
+def test_closing_the_async_generator_cancels_its_tasks(site):
+    work_ua = site(50)
+
+    async def first_then_close():
+        async with aclosing(WorkUaParser("Дизайнер", max_workers=2).aiter_resumes(50)) as resumes:
+            async for _ in resumes:
+                break
+        await asyncio.sleep(0.05)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(first_then_close()) == []
+    assert len(work_ua.requested("search")) < 10
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_crawl_fetches_only_resumes_not_seen_before(site, tmp_path, monkeypatch, mode):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    monkeypatch.setattr(resume_store, "get_resume_store", lambda: store)
+
+    def crawl():
+        parser = WorkUaParser("Дизайнер")
+        return parser.crawl() if mode == "sync" else asyncio.run(parser.acrawl())
+
+    work_ua = site(1)
+    assert numbers(crawl()) == [100, 101, 102, 103, 104]
+
+    work_ua = site(1, per_page=7)  # Two new resumes on the search page
+    assert numbers(crawl()) == [105, 106]
+    assert sorted(work_ua.requested("resume")) == [105, 106]
+    assert store.count() == 7
+    store.close()